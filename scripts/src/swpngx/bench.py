@@ -0,0 +1,391 @@
+"""Micro-benchmark of the framing pipeline on synthetic screenshots.
+
+Every device in screenshot_devices.toml gets a generated screenshot, and a
+generated bezel when the Apple PNG is not installed (or with
+``--synthetic-bezels``), so the benchmark runs without simulator captures.
+``frame()`` is timed per stage through the hooks in ``swpngx.timing``, with the
+template, shadow and title caches cleared before every frame so each stage
+does its full work. Results are written as JSON and compared against a
+checked-in baseline.
+"""
+
+from __future__ import annotations
+
+import gc
+import platform
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated
+
+import numpy
+import PIL
+import typer
+from PIL import Image, ImageDraw
+from pydantic import BaseModel, Field
+from rich.console import Console
+from rich.table import Table
+
+from swpngx import frame as framing
+from swpngx.compositor import Compositor
+from swpngx.encode import EncodeProfile
+from swpngx.fonts import ensure_framing_font
+from swpngx.string_catalog import load as load_string_catalog
+from swpngx.timing import StageTotals, record_stages
+
+console = Console()
+
+BENCH_VERSION = 2
+DEFAULT_BASELINE = Path("scripts/benchmarks/frame_baseline.json")
+DEFAULT_OUTPUT = Path("scripts/benchmarks/frame_results.json")
+
+# Used when the string catalog is missing or has no entries for the locale
+FALLBACK_TITLES = [
+    "All your documents",
+    "Filter by tags, correspondents and document types",
+    "Everything about a document at a glance",
+]
+
+# Report order; stages that did not run for a compositor are left out
+STAGES = [
+    "decode",
+    "resize",
+    "template",
+    "mask",
+    "bezel_composite",
+    "text_fit",
+    "text_wrap",
+    "text_draw",
+    "shadow",
+    "resize_to_output",
+    "layers",
+    "composite",
+    "encode",
+]
+
+
+class DeviceResult(BaseModel):
+    bezel: str
+    frames: int
+    # Milliseconds for the fastest frame with cold caches. Slower frames are
+    # mostly noise from the machine, the fastest is stable between runs.
+    stages: dict[str, float]
+    total: float
+    # Median milliseconds per frame with cold caches, for reference
+    median_total: float
+    # Milliseconds for the fastest frame with warm caches, as in a real run
+    warm_total: float
+
+
+class BenchResults(BaseModel):
+    version: int = BENCH_VERSION
+    compositor: str
+    encode: str
+    repeat: int
+    environment: dict[str, str] = Field(default_factory=dict)
+    devices: dict[str, DeviceResult] = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "BenchResults":
+        return cls.model_validate_json(path.read_text(encoding="utf-8"))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.model_dump_json(indent=2) + "\n", encoding="utf-8")
+
+
+def synthetic_bezel(device: framing.DeviceConfig) -> Image.Image:
+    """Dark rounded device body with a transparent screen cut-out."""
+    x, y = device.offset
+    width, height = device.target_size
+    size = (width + 2 * x, height + 2 * y)
+    radius = device.mask_corner_radius
+    image = Image.new("RGBA", size)
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle(
+        (0, 0, size[0] - 1, size[1] - 1), radius=radius + max(x, y), fill="#1e1e1e"
+    )
+    draw.rounded_rectangle(
+        (x, y, x + width - 1, y + height - 1), radius=radius, fill=(0, 0, 0, 0)
+    )
+    return image
+
+
+def synthetic_screenshot(size: tuple[int, int], seed: int = 0) -> Image.Image:
+    """Opaque app-like screenshot: gradient, list rows, and a photo-like area."""
+    width, height = size
+    rng = numpy.random.default_rng(seed)
+    pixels = numpy.empty((height, width, 3), dtype=numpy.uint8)
+    pixels[...] = numpy.linspace(235, 250, height, dtype=numpy.uint8)[:, None, None]
+    photo = rng.integers(0, 256, (height // 4, width, 3), dtype=numpy.uint8)
+    pixels[height // 8 : height // 8 + height // 4] = photo
+    image = Image.fromarray(pixels, "RGB")
+
+    draw = ImageDraw.Draw(image)
+    row_height = max(1, height // 24)
+    for top in range(height // 2, height - row_height, row_height):
+        draw.line((0, top, width, top), fill="#d0d0d0", width=2)
+        draw.rounded_rectangle(
+            (width // 20, top + row_height // 4, width // 2, top + row_height // 2),
+            radius=row_height // 8,
+            fill="#404040",
+        )
+    return image
+
+
+def benchmark_titles(config: framing.Config, config_dir: Path, lang: str) -> list[str]:
+    catalog_file = config_dir / config.string_catalog
+    if catalog_file.is_file():
+        catalog = load_string_catalog(catalog_file.read_text()).as_dict()
+        titles = [
+            translations[lang]
+            for screen in config.screens
+            if screen.title_key
+            and (translations := catalog.get(screen.title_key))
+            and lang in translations
+        ]
+        if titles:
+            return titles
+    return FALLBACK_TITLES
+
+
+def bench_device(
+    device: framing.DeviceConfig,
+    bezel: str,
+    config: framing.Config,
+    workdir: Path,
+    font_file: Path,
+    titles: list[str],
+    locale: str,
+    options: framing.FrameOptions,
+    repeat: int,
+) -> DeviceResult:
+    screenshot = workdir / locale / f"{device.name}-01_bench.png"
+    screenshot.parent.mkdir(parents=True, exist_ok=True)
+    synthetic_screenshot((device.target_size.x, device.target_size.y)).save(screenshot)
+    screen, style = config.load_screen_config(device.name, screenshot)
+
+    stage_samples: dict[str, list[float]] = {}
+    totals: list[float] = []
+    warm_totals: list[float] = []
+    for index, title in enumerate(titles * repeat):
+        job = framing.FrameJob(
+            file=screenshot,
+            device=device,
+            screen=screen,
+            style=style,
+            title=title,
+            locale=locale,
+            output_file=workdir / "framed" / f"{index}{options.encode.suffix}",
+        )
+        framing.clear_caches()
+        gc.collect()
+        recorder = StageTotals()
+        start = time.perf_counter()
+        with record_stages(recorder):
+            framing.frame(job, font_file, options)
+        totals.append(time.perf_counter() - start)
+        for name, seconds in recorder.seconds.items():
+            stage_samples.setdefault(name, []).append(seconds)
+
+        start = time.perf_counter()
+        framing.frame(job, font_file, options)
+        warm_totals.append(time.perf_counter() - start)
+
+    def ms(seconds: float) -> float:
+        return round(seconds * 1000, 2)
+
+    return DeviceResult(
+        bezel=bezel,
+        frames=len(totals),
+        stages={
+            name: ms(min(stage_samples[name]))
+            for name in STAGES
+            if name in stage_samples
+        },
+        total=ms(min(totals)),
+        median_total=ms(statistics.median(totals)),
+        warm_total=ms(min(warm_totals)),
+    )
+
+
+def compare_results(
+    results: BenchResults,
+    baseline: BenchResults,
+    max_regression: float,
+    min_delta: float,
+) -> list[str]:
+    """Print a comparison table and return the regressed measurements."""
+    table = Table(title="Framing benchmark (ms, fastest frame)")
+    table.add_column("Device")
+    table.add_column("Stage")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+
+    regressions: list[str] = []
+    for name, result in results.devices.items():
+        reference = baseline.devices.get(name)
+        current = {**result.stages, "total": result.total}
+        for stage_name, value in current.items():
+            base_value = reference.stages.get(stage_name) if reference else None
+            if stage_name == "total" and reference:
+                base_value = reference.total
+            if base_value is None:
+                table.add_row(name, stage_name, "-", f"{value:.1f}", "")
+                continue
+            change = (value - base_value) / base_value if base_value else 0.0
+            regressed = (
+                reference.bezel == result.bezel
+                and value - base_value > min_delta
+                and change > max_regression
+            )
+            style = "red" if regressed else ("green" if change < 0 else "")
+            table.add_row(
+                name,
+                stage_name,
+                f"{base_value:.1f}",
+                f"{value:.1f}",
+                f"[{style}]{change:+.0%}[/{style}]" if style else f"{change:+.0%}",
+            )
+            if regressed:
+                regressions.append(
+                    f"{name} {stage_name}: {base_value:.1f} -> {value:.1f} ms"
+                )
+        if reference and reference.bezel != result.bezel:
+            console.log(
+                f"[yellow]{name}: baseline used {reference.bezel} bezels, this run "
+                f"{result.bezel}; not checking for regressions"
+            )
+    console.print(table)
+    return regressions
+
+
+def main(
+    config_file: Annotated[
+        Path, typer.Option("--config", exists=True, dir_okay=False)
+    ] = Path("frames.toml"),
+    repeat: Annotated[
+        int, typer.Option("--repeat", min=1, help="Frames per title and device")
+    ] = 5,
+    locale: Annotated[
+        str, typer.Option("--locale", help="Locale of the benchmarked titles")
+    ] = "de-DE",
+    synthetic_bezels: Annotated[
+        bool,
+        typer.Option(
+            "--synthetic-bezels",
+            help="Generate bezels even when the Apple PNGs are installed",
+        ),
+    ] = False,
+    encode_profile: Annotated[
+        EncodeProfile, typer.Option("--encode", help="Output encoder")
+    ] = EncodeProfile.png,
+    compositor: Annotated[
+        Compositor, typer.Option("--compositor", help="pillow or numpy")
+    ] = Compositor.pillow,
+    output: Annotated[
+        Path, typer.Option("--output", help="Where to write the results JSON")
+    ] = DEFAULT_OUTPUT,
+    baseline_file: Annotated[
+        Path, typer.Option("--baseline", help="Baseline results to compare against")
+    ] = DEFAULT_BASELINE,
+    update_baseline: Annotated[
+        bool,
+        typer.Option("--update-baseline", help="Write this run as the new baseline"),
+    ] = False,
+    max_regression: Annotated[
+        float,
+        typer.Option(
+            "--max-regression",
+            min=0,
+            help="Fail if a stage gets slower than this fraction (0.25 = 25%)",
+        ),
+    ] = 0.25,
+    min_delta: Annotated[
+        float,
+        typer.Option(
+            "--min-delta",
+            min=0,
+            help="Ignore regressions smaller than this many milliseconds",
+        ),
+    ] = 5.0,
+):
+    config_file = config_file.resolve()
+    config = framing.load_config(config_file)
+    font_file = ensure_framing_font(config_file)
+    lang = framing.LANGUAGE_OVERRIDES.get(locale, locale).split("-")[0]
+    titles = benchmark_titles(config, config_file.parent, lang)
+    options = framing.FrameOptions(encode=encode_profile, compositor=compositor)
+
+    results = BenchResults(
+        compositor=compositor.value,
+        encode=encode_profile.value,
+        repeat=repeat,
+        environment={
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "numpy": numpy.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+    )
+
+    framing.console.quiet = True
+    try:
+        with tempfile.TemporaryDirectory(prefix="swpngx-bench-") as tmp:
+            workdir = Path(tmp)
+            for device in config.devices:
+                frame_path = config_file.parent / device.frame_path
+                if frame_path.is_file() and not synthetic_bezels:
+                    device.frame = Image.open(frame_path).convert("RGBA")
+                    bezel = "apple"
+                else:
+                    device.frame = synthetic_bezel(device)
+                    bezel = "synthetic"
+                console.log(f"Benchmarking {device.name} ({bezel} bezel)")
+                results.devices[device.name] = bench_device(
+                    device,
+                    bezel,
+                    config,
+                    workdir,
+                    font_file,
+                    titles,
+                    locale,
+                    options,
+                    repeat,
+                )
+    finally:
+        framing.console.quiet = False
+        framing.clear_caches()
+
+    results.save(output)
+    console.log(f"Wrote {output}")
+
+    if update_baseline:
+        results.save(baseline_file)
+        console.log(f"Updated baseline {baseline_file}")
+        return
+
+    if not baseline_file.is_file():
+        console.log(f"[yellow]No baseline at {baseline_file}, nothing to compare")
+        return
+    baseline = BenchResults.load(baseline_file)
+    if baseline.version != BENCH_VERSION:
+        console.log(
+            f"[yellow]Baseline {baseline_file} is from an older benchmark version; "
+            "refresh it with --update-baseline"
+        )
+        return
+    regressions = compare_results(results, baseline, max_regression, min_delta)
+    if (baseline.compositor, baseline.encode) != (results.compositor, results.encode):
+        console.log(
+            f"[yellow]Baseline was taken with --compositor {baseline.compositor} "
+            f"--encode {baseline.encode}; not checking for regressions"
+        )
+        return
+    if regressions:
+        for regression in regressions:
+            console.log(f"[red]Regression: {regression}")
+        raise typer.Exit(1)
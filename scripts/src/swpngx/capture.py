@@ -14,9 +14,11 @@
 import asyncio
 import concurrent.futures
 from dataclasses import dataclass
+import hashlib
 from pathlib import Path
 import random
 import re
+import shutil
 import subprocess
 import tempfile
 import time
@@ -100,6 +102,20 @@ def default_step_configs() -> list[ScreenshotStepConfig]:
     ]
 
 
+class SettleConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    # Shoot once the screen stops changing; launch_wait, url_wait and step
+    # waits become the longest wait. Disabled, they are slept in full.
+    enabled: bool = True
+    # Consecutive identical probe screenshots that count as settled
+    stable_probes: int = Field(default=3, ge=2)
+    # Seconds between probes
+    interval: float = Field(default=0.25, ge=0)
+    # Seconds before the first probe, for the app to start reacting
+    min_wait: float = Field(default=0.5, ge=0)
+
+
 class PreviewConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -139,6 +155,7 @@ class CaptureConfig(BaseModel):
     status_bar_time: str = "2007-01-09T09:41:00.000+01:00"
     status_bar_cellular_bars: int = Field(default=4, ge=0, le=4)
     appearance: str = "light"
+    settle: SettleConfig = Field(default_factory=SettleConfig)
     preview: PreviewConfig = Field(default_factory=PreviewConfig)
     build: BuildConfig = Field(default_factory=BuildConfig)
 
@@ -351,9 +368,12 @@ def run_command(
     check: bool = True,
     dry_run: bool = False,
     env: dict | None = None,
+    quiet: bool = False,
 ) -> None:
+    """Run ``args``, logging the command and its output; ``quiet`` only on failure."""
     display = " ".join(args)
-    console.log(f"[bold blue]$ {display}[/bold blue]")
+    if not quiet:
+        console.log(f"[bold blue]$ {display}[/bold blue]")
     if dry_run:
         return
     process = subprocess.Popen(
@@ -365,13 +385,20 @@ def run_command(
         encoding="utf-8",
         errors="replace",
     )
+    output: list[str] = []
     if process.stdout:
         for line in process.stdout:
             line = line.rstrip()
-            if line:
+            if line and quiet:
+                output.append(line)
+            elif line:
                 console.log(line, markup=False)
     return_code = process.wait()
     if check and return_code != 0:
+        if quiet:
+            console.log(f"[bold blue]$ {display}[/bold blue]")
+            for line in output:
+                console.log(line, markup=False)
         raise subprocess.CalledProcessError(return_code, args)
 
 
@@ -381,8 +408,15 @@ def simctl(
     check: bool = True,
     dry_run: bool = False,
     env: dict | None = None,
+    quiet: bool = False,
 ) -> None:
-    run_command(["xcrun", "simctl", *args], check=check, dry_run=dry_run, env=env)
+    run_command(
+        ["xcrun", "simctl", *args],
+        check=check,
+        dry_run=dry_run,
+        env=env,
+        quiet=quiet,
+    )
 
 
 def display_plan(languages: list[str], steps: list[ScreenshotStep]) -> None:
@@ -398,6 +432,105 @@ def display_plan(languages: list[str], steps: list[ScreenshotStep]) -> None:
     console.log(table)
 
 
+@dataclass(frozen=True)
+class SettleResult:
+    # Seconds waited and the configured wait, the upper bound
+    waited: float
+    budget: float
+    probes: int
+    # Digest of the last probe, also when the wait ran out; None without probes
+    digest: str | None = None
+    # Whether the screen settled, so that the last probe is its screenshot
+    settled: bool = False
+
+
+@dataclass(frozen=True)
+class WaitRecord:
+    step: str
+    result: SettleResult
+
+
+def probe_screen(target: str, path: Path) -> str:
+    """Screenshot the simulator to ``path`` without logging, return its digest."""
+    simctl(["io", target, "screenshot", "--type", "png", str(path)], quiet=True)
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def wait_for_settle(
+    target: str,
+    budget: float,
+    settle: SettleConfig,
+    probe_path: Path,
+    *,
+    changed_from: str | None = None,
+    dry_run: bool = False,
+) -> SettleResult:
+    """Wait until ``stable_probes`` probes in a row are identical, at most ``budget``.
+
+    The status bar is overridden, so an unchanged screen gives identical PNGs.
+    With ``changed_from``, the digest of the screen before a launch or URL, that
+    screen does not count as settled, so a screen that has not started to
+    change is not shot. A screen that never settles, such as one with a
+    blinking cursor, is waited for in full.
+    """
+    if dry_run or not settle.enabled or budget <= 0:
+        if budget > 0:
+            time.sleep(budget)
+        return SettleResult(waited=max(budget, 0.0), budget=budget, probes=0)
+
+    start = time.monotonic()
+    deadline = start + budget
+    time.sleep(min(settle.min_wait, budget))
+    previous: str | None = None
+    streak = 0
+    probes = 0
+    while True:
+        digest = probe_screen(target, probe_path)
+        probes += 1
+        streak = streak + 1 if digest == previous else 1
+        previous = digest
+        settled = digest != changed_from and streak >= settle.stable_probes
+        remaining = deadline - time.monotonic()
+        if settled or remaining <= 0:
+            return SettleResult(
+                waited=time.monotonic() - start,
+                budget=budget,
+                probes=probes,
+                digest=digest,
+                settled=settled,
+            )
+        time.sleep(min(settle.interval, remaining))
+
+
+def display_wait_summary(records: list[WaitRecord]) -> None:
+    """Time waited per step, against the configured waits it replaces."""
+    steps: dict[str, list[SettleResult]] = {}
+    for record in records:
+        steps.setdefault(record.step, []).append(record.result)
+    table = Table(title="Waits per step", header_style="bold magenta")
+    table.add_column("Step")
+    table.add_column("Waits", justify="right")
+    table.add_column("Settled", justify="right")
+    table.add_column("Probes", justify="right")
+    table.add_column("Configured", justify="right")
+    table.add_column("Waited", justify="right")
+    table.add_column("Saved", justify="right")
+    rows = [*steps.items(), ("total", [record.result for record in records])]
+    for step, results in rows:
+        budget = sum(result.budget for result in results)
+        waited = sum(result.waited for result in results)
+        table.add_row(
+            step,
+            str(len(results)),
+            str(sum(result.settled for result in results)),
+            str(sum(result.probes for result in results)),
+            f"{budget:.1f}s",
+            f"{waited:.1f}s",
+            f"{max(budget - waited, 0.0):.1f}s",
+        )
+    console.log(table)
+
+
 def load_capture_config(path: Path) -> CaptureConfig:
     if not path.exists():
         console.log(f"[red]Error: Config file not found: {path}")
@@ -1322,6 +1455,7 @@ def capture(
     simulators = capture_config.simulators
     launch_wait = capture_config.launch_wait
     url_wait = capture_config.url_wait
+    settle = capture_config.settle
     status_bar_time = capture_config.status_bar_time
     status_bar_cellular_bars = capture_config.status_bar_cellular_bars
     appearance = capture_config.appearance
@@ -1410,6 +1544,22 @@ def capture(
 
             install_app(target, app_path, dry_run=dry_run)
 
+            probe_path = probe_dir / f"{target}.png"
+
+            def wait(
+                step: str, budget: float, changed_from: str | None = None
+            ) -> SettleResult:
+                result = wait_for_settle(
+                    target,
+                    budget,
+                    settle,
+                    probe_path,
+                    changed_from=changed_from,
+                    dry_run=dry_run,
+                )
+                wait_records.append(WaitRecord(step=step, result=result))
+                return result
+
             for language in languages:
                 language_slug = sanitize_filename(language)
                 language_dir = output_dir / language_slug
@@ -1417,6 +1567,12 @@ def capture(
                 console.log(f"[bold green]Language: {language}")
 
                 simctl(["terminate", target, bundle_id], check=False, dry_run=dry_run)
+                # The screen before launch must not pass for the launched app
+                screen = (
+                    probe_screen(target, probe_path)
+                    if settle.enabled and not dry_run and launch_wait > 0
+                    else None
+                )
                 simctl(
                     [
                         "launch",
@@ -1431,8 +1587,11 @@ def capture(
                     ],
                     dry_run=dry_run,
                 )
-                if launch_wait > 0:
-                    time.sleep(launch_wait)
+                # Even if the launch did not settle, its last probe is the
+                # screen the first URL has to change
+                screen = (
+                    wait("launch", launch_wait, changed_from=screen).digest or screen
+                )
 
                 for index, step in enumerate(screenshot_steps, start=1):
                     progress.update(
@@ -1440,31 +1599,56 @@ def capture(
                         description=f"{screenshot_prefix} • {language} • {step.name}",
                     )
                     wait_time = step.wait if step.wait is not None else url_wait
+                    result = None
                     if step.url:
                         simctl(["openurl", target, step.url], dry_run=dry_run)
-                        if wait_time > 0:
-                            time.sleep(wait_time)
-                    elif step.wait is not None and wait_time > 0:
-                        time.sleep(wait_time)
+                        result = wait(step.name, wait_time, changed_from=screen)
+                    elif step.wait is not None:
+                        result = wait(step.name, wait_time)
 
                     screenshot_name = f"{screenshot_prefix}-{index:02d}_{sanitize_filename(step.name)}.png"
                     output_path = language_dir / screenshot_name
-                    simctl(
-                        ["io", target, "screenshot", "--type", "png", str(output_path)],
-                        dry_run=dry_run,
+                    if result is not None and result.settled:
+                        # The last probe is the settled screen
+                        shutil.copyfile(probe_path, output_path)
+                        screen = result.digest
+                    else:
+                        simctl(
+                            [
+                                "io",
+                                target,
+                                "screenshot",
+                                "--type",
+                                "png",
+                                str(output_path),
+                            ],
+                            dry_run=dry_run,
+                        )
+                        screen = (
+                            None
+                            if dry_run
+                            else hashlib.sha256(output_path.read_bytes()).hexdigest()
+                        )
+                    waited = (
+                        f" after {result.waited:.1f}s" if result is not None else ""
                     )
-                    console.log(f"Saved {output_path}")
+                    console.log(f"Saved {output_path}{waited}")
                     progress.advance(progress_task_id)
 
                     if step.post_url:
                         simctl(["openurl", target, step.post_url], dry_run=dry_run)
-                        if wait_time > 0:
-                            time.sleep(wait_time)
+                        result = wait(
+                            f"{step.name} (post)", wait_time, changed_from=screen
+                        )
+                        screen = result.digest or screen
 
             progress.update(progress_task_id, description=f"{screenshot_prefix} • done")
 
         errors: list[str] = []
-        with concurrent.futures.ThreadPoolExecutor(
+        wait_records: list[WaitRecord] = []
+        probe_root = tempfile.TemporaryDirectory(prefix="swpngx-probe-")
+        probe_dir = Path(probe_root.name)
+        with probe_root, concurrent.futures.ThreadPoolExecutor(
             max_workers=len(simulators)
         ) as executor:
             futures = {
@@ -1478,8 +1662,10 @@ def capture(
                 except Exception as exc:
                     console.log(f"[red]Error capturing {simulator.device}: {exc}")
                     errors.append(simulator.device)
-        if errors:
-            raise typer.Exit(1)
+    if wait_records:
+        display_wait_summary(wait_records)
+    if errors:
+        raise typer.Exit(1)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,17 @@
 import typer
+from swpngx.bench import main as bench_cmd
 from swpngx.bezel_frames import download_frames
 from swpngx.fonts import download_fonts
 from swpngx.devices_cli import check_devices, migrate_prefix
-from swpngx.frame import main as frame_cmd
+from swpngx.frame import (
+    delivered_main as frame_delivered_cmd,
+    main as frame_cmd,
+    merge_main as frame_merge_cmd,
+)
 from swpngx.capture import app as capture_app
 from swpngx.preview import main as preview_cmd
+from swpngx.text_bench import layout_main as bench_layout_cmd
+from swpngx.text_bench import main as bench_text_cmd
 
 app = typer.Typer(no_args_is_help=True, help="Swift Paperless automation CLI")
 
@@ -28,7 +35,26 @@ devices_app.command(
     help="Rename screenshots that use a legacy device id prefix",
 )(migrate_prefix)
 
-app.command("frame", help="Frame screenshots with device frames")(frame_cmd)
+frame_app = typer.Typer(help="Frame screenshots with device frames")
+frame_app.callback(invoke_without_command=True)(frame_cmd)
+frame_app.command(
+    "merge", help="Join the outputs of 'frame --shard' runs into one folder"
+)(frame_merge_cmd)
+frame_app.command(
+    "delivered",
+    help="Record the framed screenshots as uploaded, for the next changed list",
+)(frame_delivered_cmd)
+app.command(
+    "bench", help="Benchmark framing stages on synthetic screenshots and bezels"
+)(bench_cmd)
+app.command(
+    "bench-text", help="Benchmark title wrapping over the screenshot string catalog"
+)(bench_text_cmd)
+app.command(
+    "bench-layout",
+    help="Benchmark and snapshot line breaking over all string catalogs",
+)(bench_layout_cmd)
+app.add_typer(frame_app, name="frame")
 app.add_typer(frames_app, name="frames")
 app.add_typer(fonts_app, name="fonts")
 app.add_typer(devices_app, name="devices")
@@ -0,0 +1,131 @@
+"""Track which framed screenshots changed since they were last delivered.
+
+Framed outputs are deterministic: the same inputs give byte-identical files, as
+Pillow writes no timestamps and composed frames carry no metadata from the
+screenshots. After each run ``.delivery-manifest.json`` records the byte and
+pixel digest of every output. ``swpngx frame delivered`` copies it to
+``.delivered-manifest.json`` once an upload succeeded. Files whose pixels differ
+from that copy are listed in ``.changed-since-delivery.txt``, so the upload can
+be limited to them.
+
+The pixel digest is a hash of the decoded RGBA pixels rather than a coarse
+perceptual hash, which could not see a one-word title fix on a 2752 pixel
+tall frame. It still ignores encoder changes, such as switching ``--encode``
+between ``png`` and ``final``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from PIL import Image
+from pydantic import BaseModel, Field, ValidationError
+
+from swpngx.frame_manifest import file_digest
+
+DELIVERY_NAME = ".delivery-manifest.json"
+DELIVERED_NAME = ".delivered-manifest.json"
+CHANGED_NAME = ".changed-since-delivery.txt"
+DELIVERY_VERSION = 1
+
+
+class DeliveryEntry(BaseModel):
+    # Frame key the file was written for, see FrameManifest.outputs
+    key: str
+    sha256: str
+    pixels: str
+
+
+class DeliveryManifest(BaseModel):
+    """Maps output paths (relative to the output folder) to their digests."""
+
+    version: int = DELIVERY_VERSION
+    files: dict[str, DeliveryEntry] = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "DeliveryManifest":
+        if not path.is_file():
+            return cls()
+        try:
+            manifest = cls.model_validate_json(path.read_text(encoding="utf-8"))
+        except (ValidationError, ValueError):
+            return cls()
+        if manifest.version != DELIVERY_VERSION:
+            return cls()
+        return manifest
+
+    def save(self, path: Path) -> None:
+        data = self.model_dump(mode="json")
+        data["files"] = dict(sorted(data["files"].items()))
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def pixel_digest(path: Path) -> str:
+    with Image.open(path) as image:
+        pixels = image.convert("RGBA")
+    digest = hashlib.sha256(f"{pixels.width}x{pixels.height}".encode("ascii"))
+    digest.update(pixels.tobytes())
+    return digest.hexdigest()
+
+
+def update_delivery_manifest(
+    output_folder: Path, outputs: dict[str, str]
+) -> DeliveryManifest:
+    """Record the digests of ``outputs`` (name to frame key) in the output folder.
+
+    Files whose frame key is unchanged keep their digests, and files rewritten
+    with the same bytes keep their pixel digest, so only new or changed frames
+    are read and decoded.
+    """
+    manifest_file = output_folder / DELIVERY_NAME
+    previous = DeliveryManifest.load(manifest_file)
+    manifest = DeliveryManifest()
+    for name, key in outputs.items():
+        path = output_folder / name
+        if not path.is_file():
+            continue
+        entry = previous.files.get(name)
+        if entry is None or entry.key != key:
+            sha256 = file_digest(path)
+            if entry is None or entry.sha256 != sha256:
+                entry = DeliveryEntry(key=key, sha256=sha256, pixels=pixel_digest(path))
+            else:
+                entry = entry.model_copy(update={"key": key})
+        manifest.files[name] = entry
+    manifest.save(manifest_file)
+    return manifest
+
+
+def changed_since_delivery(
+    output_folder: Path, manifest: DeliveryManifest
+) -> tuple[list[str], list[str]]:
+    """Outputs whose pixels changed since the last delivery, and those removed.
+
+    Writes the changed names to ``.changed-since-delivery.txt``, one per line.
+    Without a delivered manifest every output counts as changed.
+    """
+    delivered = DeliveryManifest.load(output_folder / DELIVERED_NAME)
+    changed = sorted(
+        name
+        for name, entry in manifest.files.items()
+        if name not in delivered.files or delivered.files[name].pixels != entry.pixels
+    )
+    removed = sorted(set(delivered.files) - set(manifest.files))
+    changed_file = output_folder / CHANGED_NAME
+    tmp_path = changed_file.with_name(f"{changed_file.name}.tmp")
+    tmp_path.write_text("".join(f"{name}\n" for name in changed), encoding="utf-8")
+    os.replace(tmp_path, changed_file)
+    return changed, removed
+
+
+def mark_delivered(output_folder: Path) -> DeliveryManifest:
+    """Make the current outputs the baseline for the next changed list."""
+    manifest = DeliveryManifest.load(output_folder / DELIVERY_NAME)
+    manifest.save(output_folder / DELIVERED_NAME)
+    (output_folder / CHANGED_NAME).write_text("", encoding="utf-8")
+    return manifest
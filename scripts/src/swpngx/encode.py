@@ -0,0 +1,82 @@
+"""Encoders for framed screenshots."""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+from PIL import Image
+
+
+class EncodeProfile(str, Enum):
+    # Pillow's default PNG settings
+    png = "png"
+    # Low zlib level, alpha dropped when fully opaque; for quick previews
+    fast = "fast"
+    # Maximum compression, alpha dropped when fully opaque; for uploads
+    final = "final"
+    # JPEG at --jpeg-quality, accepted by App Store Connect
+    jpeg = "jpeg"
+
+    @property
+    def suffix(self) -> str:
+        return ".jpg" if self is EncodeProfile.jpeg else ".png"
+
+
+@dataclass
+class EncodeResult:
+    path: Path
+    size: int
+    seconds: float
+
+
+def is_opaque(image: Image.Image) -> bool:
+    return "A" not in image.getbands() or image.getchannel("A").getextrema() == (
+        255,
+        255,
+    )
+
+
+def save(
+    image: Image.Image, path: Path, profile: EncodeProfile, jpeg_quality: int
+) -> None:
+    if profile is EncodeProfile.png:
+        image.save(path, format="PNG")
+    elif profile is EncodeProfile.fast:
+        if is_opaque(image):
+            image = image.convert("RGB")
+        image.save(path, format="PNG", compress_level=1)
+    elif profile is EncodeProfile.final:
+        if is_opaque(image):
+            image = image.convert("RGB")
+        image.save(path, format="PNG", optimize=True)
+    elif profile is EncodeProfile.jpeg:
+        image.convert("RGB").save(path, format="JPEG", quality=jpeg_quality)
+    else:  # pragma: no cover - exhaustive
+        raise ValueError(f"Unknown encode profile: {profile}")
+
+
+def encode(
+    image: Image.Image,
+    path: Path,
+    profile: EncodeProfile = EncodeProfile.png,
+    jpeg_quality: int = 90,
+) -> EncodeResult:
+    """Encode ``image`` to ``path`` atomically.
+
+    The image is written to a temporary file next to ``path`` and renamed over
+    it, so an interrupted run never leaves a truncated output behind.
+    """
+    start = time.perf_counter()
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        save(image, tmp_path, profile, jpeg_quality)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return EncodeResult(
+        path=path, size=path.stat().st_size, seconds=time.perf_counter() - start
+    )
@@ -10,28 +10,105 @@
 # ]
 # ///
 
+import itertools
+import json
+import math
 import multiprocessing
 import os
 import re
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import shutil
+import tempfile
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import (
+    BrokenExecutor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import nullcontext
+from dataclasses import dataclass, field, fields, replace
+from enum import Enum
 from pathlib import Path
 from typing import Annotated, Optional
 
-import numpy
 import typer
-from PIL import Image, ImageDraw, ImageFilter, ImageFont
-from pydantic import BaseModel, ConfigDict, Field, RootModel, SkipValidation
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    RootModel,
+    SkipValidation,
+    field_validator,
+    model_validator,
+)
 from rich.console import Console
+from rich.table import Table
 
 try:
     import tomllib
 except ModuleNotFoundError:  # pragma: no cover - fallback for Python < 3.11
     import tomli as tomllib
 
-from swpngx.devices_config import ScreenshotDevice, load_screenshot_devices
+from swpngx.compositor import Compositor, DeviceLayers, build_device_layers, composite
+from swpngx.delivery import (
+    changed_since_delivery,
+    mark_delivered,
+    update_delivery_manifest,
+)
+from swpngx.devices_config import (
+    ScreenshotDevice,
+    load_screenshot_devices,
+    resolve_devices_path,
+)
+from swpngx.encode import EncodeProfile, EncodeResult, encode
 from swpngx.fonts import ensure_framing_font
+from swpngx.frame_manifest import (
+    MANIFEST_NAME,
+    FrameManifest,
+    Shard,
+    ShardRecord,
+    compute_key,
+    file_digest,
+    merge_shard_manifests,
+    plan_digest,
+)
+from swpngx.layout_cache import (
+    LAYOUT_CACHE_NAME,
+    LayoutCache,
+    TitleLayout,
+    layout_key,
+)
+from swpngx.memory import (
+    current_rss,
+    format_size,
+    parse_size,
+    peak_rss,
+    reset_peak_rss,
+)
+from swpngx.shared_frames import SharedFrame, attach_frame, export_frames
 from swpngx.string_catalog import load as load_string_catalog
-from swpngx.text_wrap import TextWrapConfig, calculate_text_max_width, wrap_text_pixel
+from swpngx.text_wrap import (
+    TextWrapConfig,
+    WrapStrategy,
+    calculate_text_max_width,
+    clear_font_caches,
+    fit_text_size,
+    layout_engines,
+    load_font,
+    wrap_text_pixel,
+)
+from swpngx.timing import (
+    TraceRecorder,
+    record_stages,
+    stage,
+    tagged,
+    write_chrome_trace,
+)
 
 console = Console()
 
@@ -65,7 +142,11 @@ class DeviceConfig(BaseModel):
 
     frame_path: Path = Field(alias="frame")
     name: str
-    frame: Annotated[Image.Image | None, SkipValidation] = None
+    # Decoded bezel, attached after loading; the "frame" key in the config is the
+    # bezel path above, so it must not populate this field as well.
+    frame: Annotated[Image.Image | None, SkipValidation] = Field(
+        default=None, validation_alias="frame_image"
+    )
     offset: Point = Field(default_factory=lambda: Point((0, 0)))
     post_offset: Point = Field(default_factory=lambda: Point((0, 0)))
     post_margin: int = 0
@@ -76,6 +157,25 @@ class DeviceConfig(BaseModel):
     shadow_blur: int = 30
 
 
+class TextFit(BaseModel):
+    """Pick the title size per title, see title_text_size."""
+
+    model_config = ConfigDict(frozen=True)
+
+    max_lines: int = Field(ge=1)
+    min_size: int = Field(ge=1)
+    # Defaults to the style's text_size
+    max_size: int | None = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def check_sizes(self) -> "TextFit":
+        if self.max_size is not None and self.max_size < self.min_size:
+            raise ValueError(
+                f"max_size {self.max_size} is below min_size {self.min_size}"
+            )
+        return self
+
+
 class ScreenStyle(BaseModel):
     background_color_internal: str | None = Field(
         default=None, alias="background_color"
@@ -86,6 +186,8 @@ class ScreenStyle(BaseModel):
     text_max_width_internal: int | None = Field(default=None, alias="text_max_width")
     text_margin_internal: int | None = Field(default=None, alias="text_margin")
     text_hyphenate_internal: bool | None = Field(default=None, alias="text_hyphenate")
+    text_wrap_internal: WrapStrategy | None = Field(default=None, alias="text_wrap")
+    text_fit_internal: TextFit | None = Field(default=None, alias="text_fit")
     font_spacing_internal: int | None = Field(default=None, alias="font_spacing")
     shadow_color_internal: str | None = Field(default=None, alias="shadow_color")
 
@@ -121,6 +223,14 @@ class ScreenStyle(BaseModel):
             else True
         )
 
+    @property
+    def text_wrap(self) -> WrapStrategy:
+        return self.text_wrap_internal or WrapStrategy.greedy
+
+    @property
+    def text_fit(self) -> TextFit | None:
+        return self.text_fit_internal
+
     @property
     def font_spacing(self) -> int:
         return self.font_spacing_internal or 10
@@ -147,6 +257,8 @@ class ScreenStyle(BaseModel):
                 if other.text_hyphenate_internal is not None
                 else self.text_hyphenate_internal
             ),
+            text_wrap=other.text_wrap_internal or self.text_wrap_internal,
+            text_fit=other.text_fit_internal or self.text_fit_internal,
             font_spacing=other.font_spacing_internal or self.font_spacing_internal,
             shadow_color=other.shadow_color_internal or self.shadow_color_internal,
         )
@@ -160,6 +272,15 @@ class ScreenConfig(BaseModel):
 
     style: ScreenStyle | None = None
 
+    @field_validator("device_pattern", "screen_pattern")
+    @classmethod
+    def check_pattern(cls, value: str) -> str:
+        try:
+            re.compile(value)
+        except re.error as error:
+            raise ValueError(f"Invalid pattern {value!r}: {error}") from error
+        return value
+
 
 class Config(BaseModel):
     devices: list[DeviceConfig]
@@ -169,6 +290,19 @@ class Config(BaseModel):
     string_catalog: Path = Path("Screenshots.xcstrings")
     font_file: Path
 
+    # Compiled (device, screen) patterns of each screen
+    _patterns: list[tuple[re.Pattern[str], re.Pattern[str]]] = PrivateAttr()
+    # Screen config and merged style, by the indices of the matching screens
+    _resolved: dict[tuple[int, ...], tuple[ScreenConfig, ScreenStyle]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    def model_post_init(self, __context) -> None:
+        self._patterns = [
+            (re.compile(screen.device_pattern), re.compile(screen.screen_pattern))
+            for screen in self.screens
+        ]
+
     def __getitem__(self, key: str) -> DeviceConfig:
         for device in self.devices:
             if device.name == key:
@@ -186,17 +320,179 @@ class Config(BaseModel):
         self, device: str, file: Path
     ) -> tuple[ScreenConfig, ScreenStyle]:
         stem = file.stem
-        config = ScreenConfig()
-        style = ScreenStyle()
+        matched = tuple(
+            index
+            for index, (device_regex, screen_regex) in enumerate(self._patterns)
+            if device_regex.search(device) and screen_regex.search(stem)
+        )
+        resolved = self._resolved
+        if matched not in resolved:
+            config = ScreenConfig()
+            style = ScreenStyle()
+            for index in matched:
+                config = self.screens[index]
+                style = style.merged(config.style)
+            resolved[matched] = (config, style)
+        return resolved[matched]
+
+
+@dataclass
+class FrameJob:
+    """Everything needed to frame one screenshot, resolved before any pixel work."""
+
+    file: Path
+    device: DeviceConfig
+    screen: ScreenConfig
+    style: ScreenStyle
+    title: str | None
+    locale: str
+    output_file: Path
+
+
+class Quality(str, Enum):
+    final = "final"
+    # Reduced-size previews for checking layout, see draft_job
+    draft = "draft"
+
+
+# Draft previews are rendered at 1/DRAFT_SCALE of the final size
+DRAFT_SCALE = 4
+# Modes Image.reduce handles; palette, bilevel and 16-bit PNGs are
+# converted before reducing
+REDUCIBLE_MODES = {"L", "LA", "RGB", "RGBA"}
+
+# Resident memory of an idle framing worker: interpreter, libraries and font
+WORKER_BASE_RSS = 120 << 20
+
+
+@dataclass(frozen=True)
+class FrameOptions:
+    """Run-wide framing settings that are not part of frames.toml."""
+
+    encode: EncodeProfile = EncodeProfile.png
+    jpeg_quality: int = 90
+    compositor: Compositor = Compositor.pillow
+    # Screenshots decoded ahead of, and frames encoded behind, compositing;
+    # does not affect the output
+    queue_depth: int = 2
+    quality: Quality = Quality.final
+
+    @property
+    def resample(self) -> Image.Resampling | None:
+        """Resampling filter for resizes; None is Pillow's default (bicubic)."""
+        return Image.Resampling.BOX if self.quality is Quality.draft else None
+
+    @property
+    def shadow_downscale(self) -> int:
+        return DRAFT_SCALE if self.quality is Quality.draft else 1
+
+    def cache_components(self) -> dict[str, object]:
+        components: dict[str, object] = {
+            "encode": self.encode.value,
+            "compositor": self.compositor.value,
+        }
+        if self.encode is EncodeProfile.jpeg:
+            components["jpeg_quality"] = self.jpeg_quality
+        if self.quality is Quality.draft:
+            components["quality"] = self.quality.value
+        return components
+
+
+@dataclass
+class FrameTemplate:
+    """Screenshot-independent layers for one device and style."""
+
+    frame: Image.Image
+    # Single-channel screen mask covering exactly the pasted screenshot.
+    mask: Image.Image
+    screen_origin: tuple[int, int]
+    # Successive sizes the composited bezel canvas is resized through.
+    device_sizes: list[tuple[int, int]]
+    placement: tuple[int, int]
+    background: Image.Image
+    # Alpha of the placed device for an opaque screenshot; the shadow source.
+    silhouette: Image.Image
+
+    @property
+    def output_size(self) -> tuple[int, int]:
+        return self.background.size
+
+
+@dataclass
+class TitleTile:
+    """A rendered title cropped to its bounding box."""
+
+    image: Image.Image
+    # Top-left of the tile relative to the text offset.
+    offset: tuple[int, int]
+
+
+@dataclass
+class PipelineStats:
+    """Time spent per pipeline stage, summed over files."""
+
+    files: int = 0
+    read: float = 0.0
+    compose: float = 0.0
+    write: float = 0.0
+    # Compositing waiting for a decoded screenshot, or for a free writer slot
+    starved: float = 0.0
+    blocked: float = 0.0
+    wall: float = 0.0
+    # Peak RSS in bytes of a worker framing each device, see frame_batch_worker
+    footprints: dict[str, int] = field(default_factory=dict)
+    # Title layouts used, by layout key, for the layout cache
+    layouts: dict[str, TitleLayout] = field(default_factory=dict)
+
+    def add(self, other: "PipelineStats") -> None:
+        for stat in fields(self):
+            if stat.name == "footprints":
+                for device, size in other.footprints.items():
+                    self.footprints[device] = max(self.footprints.get(device, 0), size)
+                continue
+            if stat.name == "layouts":
+                self.layouts.update(other.layouts)
+                continue
+            setattr(
+                self, stat.name, getattr(self, stat.name) + getattr(other, stat.name)
+            )
+
+
+class FramePlanError(ValueError):
+    """Screenshots that cannot be framed, found while planning."""
+
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} problem(s) found while planning:\n"
+            + "\n".join(f"  {error}" for error in errors)
+        )
 
-        for screen in self.screens:
-            matches_screen = re.search(screen.screen_pattern, stem)
-            matches_device = re.search(screen.device_pattern, device)
-            if matches_screen and matches_device:
-                config = screen
-                style = style.merged(screen.style)
 
-        return config, style
+@dataclass
+class FrameInputs:
+    """Framing configuration loaded from disk."""
+
+    config_file: Path
+    config: Config
+    string_catalog_file: Path
+    string_titles: dict[str, dict[str, str]]
+    font_file: Path
+
+
+@dataclass(frozen=True)
+class WorkerInputs:
+    """What a worker (re)loads before framing a batch."""
+
+    config_file: Path
+    string_catalog_file: Path
+    font_file: Path
+    shared_frames: dict[str, SharedFrame]
+    # Digests per kind of input, see input_fingerprint; workers reload, and drop
+    # the caches that depend on, whatever changed since their previous batch.
+    fingerprint: dict[str, str]
+    # Title layouts of earlier runs, see layout_cache
+    layouts: dict[str, TitleLayout] = field(default_factory=dict)
 
 
 LANGUAGE_OVERRIDES = {
@@ -204,6 +500,7 @@ LANGUAGE_OVERRIDES = {
     "da-DA": "da",
     "pl-PL": "pl",
 }
+DEVICE_NAME_PATTERN = re.compile(r"^(.+)-\d+_")
 OUTPUT_LOCALE_OVERRIDES = {
     "nb-NO": "no",
     "nb": "no",
@@ -265,6 +562,31 @@ _FRAME_CONFIG: Config | None = None
 _STRING_TITLES: dict[str, dict[str, str]] | None = None
 _FONT_FILE: Path | None = None
 _OUTPUT_DIR: Path | None = None
+_SHARED_FRAMES: dict[str, SharedFrame] = {}
+_FINGERPRINT: dict[str, str] = {}
+_OPTIONS = FrameOptions()
+_TRACE: TraceRecorder | None = None
+_TEMPLATES: dict[tuple[str, str, Image.Resampling | None], FrameTemplate] = {}
+_SHADOWS: dict[tuple[str, int, str, tuple[int, int], int], Image.Image] = {}
+_TITLE_TILES: dict[tuple, TitleTile | None] = {}
+_LAYERS: dict[tuple[str, str, str], DeviceLayers] = {}
+_DRAFT_DEVICES: dict[str, DeviceConfig] = {}
+# Title layouts by layout key, and those used since frame_pipeline last
+# reported them
+_LAYOUTS: dict[str, TitleLayout] = {}
+_USED_LAYOUTS: dict[str, TitleLayout] = {}
+_FONT_DIGESTS: dict[Path, str] = {}
+
+
+def clear_caches() -> None:
+    """Forget cached templates, shadows, titles, fonts and compositor layers."""
+    _TEMPLATES.clear()
+    _SHADOWS.clear()
+    _TITLE_TILES.clear()
+    _LAYERS.clear()
+    _DRAFT_DEVICES.clear()
+    _FONT_DIGESTS.clear()
+    clear_font_caches()
 
 
 def should_process_file(file: Path) -> bool:
@@ -329,39 +651,646 @@ def load_config(config_file: Path) -> Config:
     return Config(**config_data)
 
 
-def init_worker(
-    config_file: Path,
-    string_catalog_file: Path,
-    output_dir: Path,
-    font_file: Path,
-) -> None:
-    global _FRAME_CONFIG, _STRING_TITLES, _FONT_FILE, _OUTPUT_DIR
+def load_frame_inputs(config_file: Path) -> FrameInputs:
     config = load_config(config_file)
-    config.load_frames(config_file.resolve().parent)
-    _FRAME_CONFIG = config
-    _STRING_TITLES = load_string_catalog(string_catalog_file.read_text()).as_dict()
-    _FONT_FILE = font_file
-    _OUTPUT_DIR = output_dir
+    string_catalog_file = config_file.parent / config.string_catalog
+    if not string_catalog_file.is_file():
+        raise FileNotFoundError(f"String catalog not found at {string_catalog_file}")
+    return FrameInputs(
+        config_file=config_file,
+        config=config,
+        string_catalog_file=string_catalog_file,
+        string_titles=load_string_catalog(string_catalog_file.read_text()).as_dict(),
+        font_file=ensure_framing_font(config_file),
+    )
 
 
-def frame_worker(file: Path) -> None:
+def input_fingerprint(inputs: FrameInputs, digests: dict[Path, str]) -> dict[str, str]:
+    """Digests of the inputs shared by all screenshots, by kind."""
+    config_dir = inputs.config_file.parent
+    devices = inputs.config.devices
+    bezels = [config_dir / device.frame_path for device in devices]
+    return {
+        "config": cached_digest(inputs.config_file, digests),
+        "catalog": cached_digest(inputs.string_catalog_file, digests),
+        "font": cached_digest(inputs.font_file, digests),
+        # Geometry and bezels, wherever the devices are defined
+        "devices": compute_key(
+            {
+                "devices": [
+                    device.model_dump(mode="json", exclude={"frame"})
+                    for device in devices
+                ],
+                "bezels": [
+                    cached_digest(bezel, digests) if bezel.is_file() else None
+                    for bezel in bezels
+                ],
+            }
+        ),
+    }
+
+
+def invalidate_caches(previous: dict[str, str], current: dict[str, str]) -> None:
+    """Drop cached layers that depend on inputs that changed.
+
+    Styles and titles are part of the cache keys themselves, so only device
+    geometry, bezels and the font need explicit invalidation.
+    """
+    if previous.get("devices") != current.get("devices"):
+        clear_caches()
+    elif previous.get("font") != current.get("font"):
+        _TITLE_TILES.clear()
+        _FONT_DIGESTS.clear()
+        clear_font_caches()
+
+
+def init_worker(options: FrameOptions, profile: bool = False) -> None:
+    global _OPTIONS, _TRACE
+    # Config, titles and bezels are loaded by refresh_worker with each batch
+    _OPTIONS = options
+    _TRACE = TraceRecorder() if profile else None
+
+
+def refresh_worker(inputs: WorkerInputs) -> None:
+    global _FRAME_CONFIG, _STRING_TITLES, _FONT_FILE, _OUTPUT_DIR, _SHARED_FRAMES
+    global _FINGERPRINT
+    _SHARED_FRAMES = inputs.shared_frames
+    _LAYOUTS.update(inputs.layouts)
+    if inputs.fingerprint == _FINGERPRINT:
+        return
+    invalidate_caches(_FINGERPRINT, inputs.fingerprint)
+    # Bezels are attached lazily from the parent's shared copies, see worker_job
+    _FRAME_CONFIG = load_config(inputs.config_file)
+    _STRING_TITLES = load_string_catalog(
+        inputs.string_catalog_file.read_text()
+    ).as_dict()
+    _FONT_FILE = inputs.font_file
+    _OUTPUT_DIR = frame_output_folder(_FRAME_CONFIG, _OPTIONS)
+    _FINGERPRINT = inputs.fingerprint
+
+
+def worker_job(file: Path) -> FrameJob:
     if _FRAME_CONFIG is None or _STRING_TITLES is None:
         raise RuntimeError("Worker config not initialized")
     if _FONT_FILE is None or _OUTPUT_DIR is None:
         raise RuntimeError("Worker paths not initialized")
-    frame(file, _FRAME_CONFIG, _OUTPUT_DIR, _STRING_TITLES, _FONT_FILE)
+    job = resolve_frame_job(
+        file, _FRAME_CONFIG, _OUTPUT_DIR, _STRING_TITLES, _OPTIONS.encode.suffix
+    )
+    if job is None:
+        raise RuntimeError(f"No frame config for {file}")
+    if job.device.frame is None:
+        job.device.frame = attach_frame(_SHARED_FRAMES[job.device.name])
+    return job
+
+
+def frame_batch_worker(
+    files: list[Path], inputs: WorkerInputs
+) -> tuple[list[tuple[Path, EncodeResult]], PipelineStats, list[dict]]:
+    """Frame a batch; also returns the batch's trace events when profiling."""
+    refresh_worker(inputs)
+    if _FONT_FILE is None:
+        raise RuntimeError("Worker paths not initialized")
+    results: list[tuple[Path, EncodeResult]] = []
+    jobs = [worker_job(file) for file in files]
+    # Batches never mix devices, so the peak is this device's footprint. Where
+    # the peak cannot be reset it includes earlier batches, which only
+    # overestimates.
+    reset_peak_rss()
+    with record_stages(_TRACE) if _TRACE else nullcontext(), stage("batch"):
+        stats = frame_pipeline(
+            jobs,
+            _FONT_FILE,
+            _OPTIONS,
+            lambda file, result: results.append((file, result)),
+        )
+    if jobs:
+        stats.footprints[jobs[0].device.name] = peak_rss()
+    return results, stats, _TRACE.take() if _TRACE else []
+
+
+def dispatch_batches(
+    executor: ProcessPoolExecutor,
+    inputs: WorkerInputs,
+    jobs: list[FrameJob],
+    chunk_size: int,
+    record: Callable[[Path, EncodeResult], None],
+    trace: TraceRecorder | None = None,
+) -> PipelineStats:
+    stats = PipelineStats()
+    futures = [
+        executor.submit(frame_batch_worker, batch, inputs)
+        for batch in batch_by_device(jobs, chunk_size)
+    ]
+    for future in as_completed(futures):
+        batch_results, batch_stats, events = future.result()
+        for file, result in batch_results:
+            record(file, result)
+        stats.add(batch_stats)
+        if trace:
+            trace.events.extend(events)
+    return stats
+
+
+def batch_by_device(jobs: list[FrameJob], chunk_size: int) -> list[list[Path]]:
+    """Split jobs into chunks that never mix devices or styles.
+
+    A chunk is framed by a single worker, which then reuses the same bezel,
+    template and shadow for every file in it.
+    """
+    groups: dict[tuple[str, str], list[Path]] = {}
+    for job in jobs:
+        key = (job.device.name, job.style.model_dump_json())
+        groups.setdefault(key, []).append(job.file)
+    return [
+        files[start : start + chunk_size]
+        for files in groups.values()
+        for start in range(0, len(files), chunk_size)
+    ]
+
+
+def frame_cache_key(
+    job: FrameJob,
+    config_dir: Path,
+    font_file: Path,
+    digests: dict[Path, str],
+    options: FrameOptions,
+) -> str:
+    """Content-addressed key of everything that influences the framed output."""
+    return compute_key(
+        {
+            "input": cached_digest(job.file, digests),
+            "device": job.device.model_dump(mode="json", exclude={"frame"}),
+            # Unset style fields are left out, so adding one keeps the keys
+            "style": job.style.model_dump(mode="json", exclude_none=True),
+            "title": job.title,
+            "locale": job.locale,
+            "font": cached_digest(font_file, digests),
+            "bezel": cached_digest(config_dir / job.device.frame_path, digests),
+            **layout_engines(),
+            **options.cache_components(),
+        }
+    )
+
+
+def cached_digest(path: Path, digests: dict[Path, str]) -> str:
+    path = path.resolve()
+    if path not in digests:
+        digests[path] = file_digest(path)
+    return digests[path]
+
+
+def plan_frames(
+    inputs: FrameInputs,
+    files: list[Path],
+    manifest: FrameManifest,
+    digests: dict[Path, str],
+    options: FrameOptions,
+    shard: Shard | None = None,
+) -> tuple[dict[Path, tuple[FrameJob, str, str]], list[Path]]:
+    """Resolve every file to its job, output name and key; return those to frame.
+
+    Every file is resolved before anything is hashed, and all problems (missing
+    titles, unsupported locales, and inputs that would overwrite each other's
+    output) are raised together as a FramePlanError. This covers the whole
+    plan even with ``shard``, which then keeps only that shard's files and
+    records them in ``manifest.shard``.
+    """
+    start = time.perf_counter()
+    config = inputs.config
+    output_folder = frame_output_folder(config, options)
+    resolved: dict[Path, tuple[FrameJob, str]] = {}
+    outputs: dict[str, Path] = {}
+    errors: list[str] = []
+    device_names = {device.name for device in config.devices}
+    for file in files:
+        if get_device_name(file.stem) not in device_names:
+            console.log(f"[yellow]No frame config for {file}, skipping")
+            continue
+        try:
+            name = frame_output_name(file, options.encode.suffix)
+        except ValueError as error:
+            errors.append(f"{file}: {error}")
+            continue
+        try:
+            job = resolve_frame_job(
+                file, config, output_folder, inputs.string_titles, options.encode.suffix
+            )
+        except KeyError as error:
+            errors.append(f"{file}: {error.args[0]}")
+        else:
+            if job is not None:
+                if (problem := text_fit_problem(job.style)) is not None:
+                    errors.append(f"{file}: {problem}")
+                resolved[file] = (job, name)
+        if name in outputs:
+            errors.append(f"{file}: same output {name} as {outputs[name]}")
+        outputs.setdefault(name, file)
+    if errors:
+        raise FramePlanError(errors)
+
+    manifest.shard = None
+    if shard is not None:
+        names = {name for _, name in resolved.values()}
+        resolved = {
+            file: (job, name)
+            for file, (job, name) in resolved.items()
+            if shard.contains(
+                job.device.name, job.locale, file.stem[len(job.device.name) + 1 :]
+            )
+        }
+        manifest.shard = ShardRecord(
+            index=shard.index,
+            count=shard.count,
+            plan=plan_digest(names),
+            total=len(names),
+            outputs=sorted(name for _, name in resolved.values()),
+        )
+
+    planned: dict[Path, tuple[FrameJob, str, str]] = {}
+    pending: list[Path] = []
+    for file, (job, name) in resolved.items():
+        key = frame_cache_key(
+            job, inputs.config_file.parent, inputs.font_file, digests, options
+        )
+        planned[file] = (job, name, key)
+        if manifest.outputs.get(name) == key and job.output_file.is_file():
+            continue
+        pending.append(file)
+
+    scope = f" in shard {shard}" if shard else ""
+    console.log(
+        f"{len(pending)} of {len(planned)} screenshot(s){scope} need framing "
+        f"(planned in {(time.perf_counter() - start) * 1000:.0f} ms)"
+    )
+    return planned, pending
+
+
+def log_plan(
+    planned: dict[Path, tuple[FrameJob, str, str]], pending: list[Path]
+) -> None:
+    table = Table(title="Framing plan")
+    table.add_column("screenshot")
+    table.add_column("device")
+    table.add_column("locale")
+    table.add_column("title", no_wrap=True, max_width=32)
+    table.add_column("output")
+    table.add_column("status")
+    todo = set(pending)
+    for file, (job, name, _) in planned.items():
+        table.add_row(
+            f"{file.parent.name}/{file.name}",
+            job.device.name,
+            job.locale,
+            " ".join((job.title or "").split()),
+            name,
+            "frame" if file in todo else "up to date",
+        )
+    console.print(table)
+
+
+def prune_stale_outputs(
+    manifest: FrameManifest, output_folder: Path, current: set[str]
+) -> None:
+    for name in sorted(set(manifest.outputs) - current):
+        stale = output_folder / name
+        if stale.is_file():
+            console.log(f"Removing stale {stale}")
+            stale.unlink()
+        del manifest.outputs[name]
+
+
+def estimate_footprint(
+    device: DeviceConfig, config_dir: Path, options: FrameOptions
+) -> int:
+    """Rough peak RSS of a worker framing ``device``, for devices never measured.
+
+    A worker maps the full-size bezel, holds about six bezel-sized and three
+    frame-sized RGBA layers while compositing (a quarter the size for drafts),
+    and ``queue_depth`` screenshots and frames on either side of that. Final
+    frames of the configured devices measure within 20% of this; measured
+    footprints replace the estimate after the first run.
+    """
+    frame_path = config_dir / device.frame_path
+    try:
+        with Image.open(frame_path) as bezel:
+            bezel_pixels = bezel.width * bezel.height
+    except OSError:
+        bezel_pixels = (device.target_size.x + 2 * device.offset.x) * (
+            device.target_size.y + 2 * device.offset.y
+        )
+    # Frames come out at the screenshot size
+    output_pixels = device.target_size.x * device.target_size.y
+    queued = 4 * 2 * options.queue_depth * output_pixels
+    scale = DRAFT_SCALE**2 if options.quality is Quality.draft else 1
+    layers = 4 * (6 * bezel_pixels + 3 * output_pixels) // scale
+    return WORKER_BASE_RSS + 4 * bezel_pixels + layers + queued
+
+
+def memory_limited_jobs(
+    jobs: int,
+    budget: int,
+    devices: list[DeviceConfig],
+    footprints: dict[str, int],
+    config_dir: Path,
+    options: FrameOptions,
+) -> int:
+    """Lower ``jobs`` so that workers framing the largest device fit ``budget``.
+
+    Uses per-device peak RSS measured on earlier runs (see
+    ``FrameManifest.footprints``), and an estimate for devices not measured yet.
+    Every worker may end up framing the largest device, so that one counts.
+    """
+    sizes: dict[str, tuple[int, bool]] = {}
+    for device in devices:
+        if device.name in sizes:
+            continue
+        if device.name in footprints:
+            sizes[device.name] = (footprints[device.name], True)
+        else:
+            sizes[device.name] = (
+                estimate_footprint(device, config_dir, options),
+                False,
+            )
+    if not sizes:
+        return jobs
+    name, (footprint, measured) = max(sizes.items(), key=lambda item: item[1][0])
+    available = budget - current_rss()
+    limited = max(1, min(jobs, available // footprint))
+    source = "measured" if measured else "estimated"
+    message = (
+        f"{limited} worker(s) fit in {format_size(budget)}: {name} needs "
+        f"{format_size(footprint)} per worker ({source})"
+    )
+    if available < footprint:
+        console.log(f"[yellow]{message}, the budget may still be exceeded")
+    elif limited < jobs:
+        console.log(f"{message}, down from {jobs}")
+    else:
+        console.log(message)
+    return limited
+
+
+def update_delivery(
+    output_folder: Path, manifest: FrameManifest, options: FrameOptions
+) -> None:
+    """Refresh the delivery digests and list what changed since the last upload.
+
+    Drafts are never delivered, so they are left out.
+    """
+    if options.quality is Quality.draft:
+        return
+    with stage("delivery"):
+        delivery = update_delivery_manifest(output_folder, manifest.outputs)
+        changed, removed = changed_since_delivery(output_folder, delivery)
+    message = (
+        f"{len(changed)} of {len(delivery.files)} framed screenshot(s) changed "
+        "since the last delivery"
+    )
+    if removed:
+        message += f", {len(removed)} removed"
+    console.log(message)
+
+
+def log_encode_summary(options: FrameOptions, results: list[EncodeResult]) -> None:
+    if not results:
+        return
+    total_size = sum(result.size for result in results)
+    total_seconds = sum(result.seconds for result in results)
+    profile = options.encode.value
+    if options.encode is EncodeProfile.jpeg:
+        profile += f" (quality {options.jpeg_quality})"
+
+    table = Table(title="Encoding")
+    table.add_column("profile")
+    table.add_column("files", justify="right")
+    table.add_column("total size", justify="right")
+    table.add_column("mean size", justify="right")
+    table.add_column("mean encode time", justify="right")
+    table.add_row(
+        profile,
+        str(len(results)),
+        f"{total_size / 1e6:.1f} MB",
+        f"{total_size / len(results) / 1e6:.2f} MB",
+        f"{total_seconds / len(results) * 1000:.0f} ms",
+    )
+    console.print(table)
+
+
+def log_pipeline_summary(stats: PipelineStats, wall: float) -> None:
+    if not stats.files:
+        return
+    table = Table(title=f"Pipeline ({stats.files / wall:.2f} files/s overall)")
+    table.add_column("stage")
+    table.add_column("busy", justify="right")
+    table.add_column("files/s", justify="right")
+    table.add_column("waiting", justify="right")
+    rows = [
+        ("read", stats.read, ""),
+        ("compose", stats.compose, f"{stats.starved:.1f} s for reads"),
+        ("write", stats.write, f"{stats.blocked:.1f} s blocked compose"),
+    ]
+    for name, busy, waiting in rows:
+        rate = f"{stats.files / busy:.2f}" if busy else "-"
+        table.add_row(name, f"{busy:.1f} s", rate, waiting)
+    console.print(table)
+
+
+def log_profile_summary(events: list[dict]) -> None:
+    """Print framing time per device and locale, and how busy workers were."""
+    # A file's read, compose and write run on different threads
+    frames = [
+        event for event in events if event["name"] in ("read", "compose", "write")
+    ]
+    if not frames:
+        return
+    for tag in ("device", "locale"):
+        totals: dict[str, float] = {}
+        files: dict[str, set[str]] = {}
+        for event in frames:
+            value = event["args"].get(tag, "?")
+            totals[value] = totals.get(value, 0.0) + event["dur"]
+            files.setdefault(value, set()).add(json.dumps(event["args"]))
+        table = Table(title=f"Framing time by {tag}")
+        table.add_column(tag)
+        table.add_column("files", justify="right")
+        table.add_column("total", justify="right")
+        table.add_column("mean", justify="right")
+        for value, total in sorted(totals.items(), key=lambda item: -item[1]):
+            count = len(files[value])
+            table.add_row(
+                value,
+                str(count),
+                f"{total / 1e6:.1f} s",
+                f"{total / count / 1e3:.0f} ms",
+            )
+        console.print(table)
+
+    pools = [event for event in events if event["name"] == "pool"]
+    batches = [event for event in events if event["name"] == "batch"]
+    if not pools or not batches:
+        return
+    wall = pools[0]["dur"]
+    busy: dict[int, float] = {}
+    for event in batches:
+        busy[event["pid"]] = busy.get(event["pid"], 0.0) + event["dur"]
+    table = Table(title="Worker utilization")
+    table.add_column("worker pid")
+    table.add_column("busy", justify="right")
+    table.add_column("idle", justify="right")
+    for pid, seconds in sorted(busy.items()):
+        table.add_row(str(pid), f"{seconds / wall:.0%}", f"{1 - seconds / wall:.0%}")
+    console.print(table)
 
 
 def main(
+    ctx: typer.Context,
+    # Checked below rather than with exists=True: this is also the callback of
+    # the frame subcommands, which have their own --config
     config_file: Annotated[
-        Path, typer.Option("--config", exists=True, dir_okay=False)
+        Path,
+        typer.Option("--config", dir_okay=False, help="Path to frames TOML config"),
     ] = Path("frames.toml"),
     jobs: Annotated[int, typer.Option("--jobs", "-j")] = multiprocessing.cpu_count(),
+    force: Annotated[
+        bool,
+        typer.Option("--force", help="Reframe everything, ignoring the manifest"),
+    ] = False,
+    chunk_size: Annotated[
+        Optional[int],
+        typer.Option(
+            "--chunk-size",
+            min=1,
+            help="Screenshots per worker task (default: about two tasks per job)",
+        ),
+    ] = None,
+    encode_profile: Annotated[
+        EncodeProfile,
+        typer.Option(
+            "--encode",
+            help="Output encoder: png (Pillow defaults), fast (previews), "
+            "final (smallest PNG) or jpeg",
+        ),
+    ] = EncodeProfile.png,
+    jpeg_quality: Annotated[
+        int, typer.Option("--jpeg-quality", min=1, max=100, help="JPEG quality")
+    ] = 90,
+    compositor: Annotated[
+        Compositor,
+        typer.Option(
+            "--compositor",
+            help=(
+                "pillow (reference) or numpy (single pass, premultiplied alpha; "
+                "not byte-identical to pillow, pixels along the screen and "
+                "bezel edges differ)"
+            ),
+        ),
+    ] = Compositor.pillow,
+    profile: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--profile",
+            dir_okay=False,
+            help="Write a Chrome/Perfetto trace of the run (chrome://tracing)",
+        ),
+    ] = None,
+    queue_depth: Annotated[
+        int,
+        typer.Option(
+            "--queue-depth",
+            min=1,
+            help="Screenshots decoded ahead and frames encoded behind, per process",
+        ),
+    ] = 2,
+    watch: Annotated[
+        bool,
+        typer.Option(
+            "--watch",
+            help="Keep running and reframe whatever an input change affects",
+        ),
+    ] = False,
+    poll_interval: Annotated[
+        float,
+        typer.Option(
+            "--poll-interval", min=0.1, help="Seconds between input checks in --watch"
+        ),
+    ] = 1.0,
+    quality: Annotated[
+        Quality,
+        typer.Option(
+            "--quality",
+            help="final, or draft for quick quarter-size previews written to "
+            "<output_folder>-draft",
+        ),
+    ] = Quality.final,
+    plan_only: Annotated[
+        bool,
+        typer.Option(
+            "--plan-only",
+            help="Check the config and print what would be framed, without framing",
+        ),
+    ] = False,
+    max_memory: Annotated[
+        Optional[str],
+        typer.Option(
+            "--max-memory",
+            help="Use fewer --jobs if workers would need more memory than this "
+            "in total, e.g. 6G or 1500M",
+        ),
+    ] = None,
+    shard_spec: Annotated[
+        Optional[str],
+        typer.Option(
+            "--shard",
+            help="Frame only part i of n of the screenshots, e.g. 2/4; join the "
+            "parts with 'frame merge'",
+        ),
+    ] = None,
 ):
+    if ctx.invoked_subcommand is not None:
+        return
+    if not config_file.is_file():
+        problem = "is a directory" if config_file.is_dir() else "does not exist"
+        raise typer.BadParameter(
+            f"File '{config_file}' {problem}.", param_hint="'--config'"
+        )
     config_file = config_file.resolve()
+    try:
+        memory_budget = parse_size(max_memory) if max_memory else None
+    except ValueError as error:
+        raise typer.BadParameter(str(error), param_hint="--max-memory")
+    try:
+        shard = Shard.parse(shard_spec) if shard_spec else None
+    except ValueError as error:
+        raise typer.BadParameter(str(error), param_hint="--shard")
+    if watch and profile:
+        console.log("[red]--profile cannot be combined with --watch")
+        raise typer.Exit(1)
+    if watch and shard:
+        console.log("[red]--shard cannot be combined with --watch")
+        raise typer.Exit(1)
+    trace = TraceRecorder() if profile else None
     jobs = max(1, jobs)
+    options = FrameOptions(
+        encode=encode_profile,
+        jpeg_quality=jpeg_quality,
+        compositor=compositor,
+        queue_depth=queue_depth,
+        quality=quality,
+    )
+    if watch:
+        watch_frames(
+            config_file,
+            options,
+            jobs,
+            chunk_size,
+            force,
+            poll_interval,
+            memory_budget,
+        )
+        return
+
     config = load_config(config_file)
-    config.load_frames(config_file.parent)
 
     string_catalog_file = config_file.parent / config.string_catalog
     if not string_catalog_file.is_file():
@@ -369,37 +1298,420 @@ def main(
         raise typer.Exit(1)
     string_titles = load_string_catalog(string_catalog_file.read_text()).as_dict()
 
-    output_folder = config.output_folder
-    output_folder.mkdir(parents=True, exist_ok=True)
-
+    output_folder = frame_output_folder(config, options)
     files = collect_input_files([config.input_folder])
     if not files:
         console.log("[yellow]No screenshots found to frame")
         return
 
-    font_file = ensure_framing_font(config_file)
+    inputs = FrameInputs(
+        config_file=config_file,
+        config=config,
+        string_catalog_file=string_catalog_file,
+        string_titles=string_titles,
+        font_file=ensure_framing_font(config_file),
+    )
 
-    if jobs == 1 or len(files) == 1:
-        for file in files:
-            frame(file, config, output_folder, string_titles, font_file)
-    else:
-        with ProcessPoolExecutor(
-            max_workers=jobs,
-            initializer=init_worker,
-            initargs=(config_file, string_catalog_file, output_folder, font_file),
-        ) as executor:
-            futures = [executor.submit(frame_worker, file) for file in files]
-            for future in as_completed(futures):
-                future.result()
+    manifest_file = output_folder / MANIFEST_NAME
+    manifest = FrameManifest.load(manifest_file)
+    if force:
+        manifest.outputs.clear()
+    layout_cache = LayoutCache.load(output_folder / LAYOUT_CACHE_NAME)
+    digests: dict[Path, str] = {}
+    try:
+        with record_stages(trace) if trace else nullcontext(), stage("plan"):
+            planned, pending = plan_frames(
+                inputs, files, manifest, digests, options, shard
+            )
+    except FramePlanError as error:
+        for message in error.errors:
+            console.log(f"[red]{message}")
+        console.log(
+            f"[red]{len(error.errors)} problem(s) found while planning, "
+            "nothing was framed"
+        )
+        raise typer.Exit(1)
+    if plan_only:
+        log_plan(planned, pending)
+        return
+
+    output_folder.mkdir(parents=True, exist_ok=True)
+    if shard is None:
+        # A shard only knows its own outputs; "frame merge" prunes the rest
+        prune_stale_outputs(
+            manifest, output_folder, {name for _, name, _ in planned.values()}
+        )
+    if memory_budget is not None and jobs > 1 and len(pending) > 1:
+        jobs = memory_limited_jobs(
+            jobs,
+            memory_budget,
+            [planned[file][0].device for file in pending],
+            manifest.footprints,
+            config_file.parent,
+            options,
+        )
+
+    results: list[EncodeResult] = []
+    stats = PipelineStats()
+    start = time.perf_counter()
+
+    def record(file: Path, result: EncodeResult) -> None:
+        _, name, key = planned[file]
+        manifest.outputs[name] = key
+        results.append(result)
+
+    try:
+        with record_stages(trace) if trace else nullcontext():
+            if jobs == 1 or len(pending) == 1:
+                if pending:
+                    with stage("load_frames"):
+                        config.load_frames(config_file.parent)
+                    _LAYOUTS.update(layout_cache.layouts)
+                    stats = frame_pipeline(
+                        [planned[file][0] for file in pending],
+                        inputs.font_file,
+                        options,
+                        record,
+                    )
+            elif pending:
+                frame_paths = {
+                    job.device.name: config_file.parent / job.device.frame_path
+                    for job, _, _ in (planned[file] for file in pending)
+                }
+                with tempfile.TemporaryDirectory(prefix="swpngx-frames-") as tmp:
+                    with stage("export_frames"):
+                        shared_frames = export_frames(frame_paths, Path(tmp))
+                    worker_inputs = WorkerInputs(
+                        config_file=config_file,
+                        string_catalog_file=string_catalog_file,
+                        font_file=inputs.font_file,
+                        shared_frames=shared_frames,
+                        fingerprint=input_fingerprint(inputs, digests),
+                        layouts=layout_cache.layouts,
+                    )
+                    with stage("pool"), ProcessPoolExecutor(
+                        max_workers=jobs,
+                        initializer=init_worker,
+                        initargs=(options, trace is not None),
+                    ) as executor:
+                        stats = dispatch_batches(
+                            executor,
+                            worker_inputs,
+                            [planned[file][0] for file in pending],
+                            chunk_size or math.ceil(len(pending) / (jobs * 2)),
+                            record,
+                            trace,
+                        )
+    finally:
+        manifest.footprints.update(stats.footprints)
+        manifest.save(manifest_file)
+        if stats.layouts:
+            layout_cache.touch(stats.layouts)
+            layout_cache.save(output_folder / LAYOUT_CACHE_NAME)
+
+    log_encode_summary(options, results)
+    log_pipeline_summary(stats, time.perf_counter() - start)
+    if shard is None:
+        update_delivery(output_folder, manifest, options)
+    if trace and profile:
+        worker_pids = sorted({event["pid"] for event in trace.events} - {os.getpid()})
+        write_chrome_trace(
+            profile,
+            trace.events,
+            {
+                os.getpid(): "swpngx frame",
+                **{pid: f"worker {index}" for index, pid in enumerate(worker_pids, 1)},
+            },
+        )
+        log_profile_summary(trace.events)
+        console.log(f"Wrote trace to {profile}")
 
     console.log("[green]Done")
 
 
+def watched_files(
+    config_file: Path, inputs: FrameInputs | None, files: list[Path]
+) -> dict[Path, tuple[int, int] | None]:
+    """Modification time and size of every input, None for missing files."""
+    paths = [config_file, resolve_devices_path(config_file), *files]
+    if inputs is not None:
+        config_dir = config_file.parent
+        paths += [inputs.string_catalog_file, inputs.font_file]
+        paths += [config_dir / device.frame_path for device in inputs.config.devices]
+
+    state: dict[Path, tuple[int, int] | None] = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            state[path] = None
+        else:
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def merge_main(
+    shard_dirs: Annotated[
+        list[Path],
+        typer.Argument(
+            exists=True, file_okay=False, help="Output folders of the --shard runs"
+        ),
+    ],
+    config_file: Annotated[
+        Path, typer.Option("--config", exists=True, dir_okay=False)
+    ] = Path("frames.toml"),
+    output: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--output",
+            file_okay=False,
+            help="Folder to merge into (default: output_folder from the config)",
+        ),
+    ] = None,
+):
+    """Join the outputs of sharded runs, checking that they cover the whole plan."""
+    if output is None:
+        output = load_config(config_file.resolve()).output_folder
+
+    manifests: dict[Path, FrameManifest] = {}
+    errors: list[str] = []
+    for shard_dir in shard_dirs:
+        if not (shard_dir / MANIFEST_NAME).is_file():
+            errors.append(f"{shard_dir}: no {MANIFEST_NAME}")
+            continue
+        manifest = FrameManifest.load(shard_dir / MANIFEST_NAME)
+        manifests[shard_dir] = manifest
+        for name in manifest.shard.outputs if manifest.shard else []:
+            if not (shard_dir / name).is_file():
+                errors.append(f"{shard_dir}: {name} is missing")
+    merged, merge_errors = merge_shard_manifests(manifests)
+    errors += merge_errors
+    if errors:
+        for message in errors:
+            console.log(f"[red]{message}")
+        console.log(f"[red]{len(errors)} problem(s) found, nothing was merged")
+        raise typer.Exit(1)
+
+    output.mkdir(parents=True, exist_ok=True)
+    manifest_file = output / MANIFEST_NAME
+    previous = FrameManifest.load(manifest_file)
+    prune_stale_outputs(previous, output, set(merged.outputs))
+    for shard_dir, manifest in manifests.items():
+        if shard_dir.resolve() == output.resolve():
+            continue
+        for name in manifest.shard.outputs:
+            target = output / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(f"{target.name}.tmp")
+            shutil.copyfile(shard_dir / name, tmp_path)
+            os.replace(tmp_path, target)
+    merged.footprints = {**previous.footprints, **merged.footprints}
+    merged.save(manifest_file)
+    console.log(
+        f"Merged {len(merged.outputs)} output(s) from {len(manifests)} shard(s) "
+        f"into {output}"
+    )
+    update_delivery(output, merged, FrameOptions())
+
+
+def delivered_main(
+    config_file: Annotated[
+        Path, typer.Option("--config", exists=True, dir_okay=False)
+    ] = Path("frames.toml"),
+    output: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--output",
+            file_okay=False,
+            help="Output folder that was uploaded (default: output_folder from "
+            "the config)",
+        ),
+    ] = None,
+):
+    """Record the current framed screenshots as delivered."""
+    if output is None:
+        output = load_config(config_file.resolve()).output_folder
+    if not (output / MANIFEST_NAME).is_file():
+        console.log(f"[red]No framed screenshots in {output}")
+        raise typer.Exit(1)
+    delivery = mark_delivered(output)
+    console.log(f"Marked {len(delivery.files)} framed screenshot(s) as delivered")
+
+
+def watch_frames(
+    config_file: Path,
+    options: FrameOptions,
+    jobs: int,
+    chunk_size: int | None,
+    force: bool,
+    poll_interval: float,
+    memory_budget: int | None = None,
+) -> None:
+    """Reframe whatever an input change affects until interrupted.
+
+    Inputs are polled rather than watched through OS notifications, which
+    keeps this dependency free and portable. The worker pool stays up between
+    passes, so bezels, fonts and layer caches stay loaded; workers drop only
+    what a change invalidates (see refresh_worker). Which outputs to redo is
+    decided by the manifest, exactly as for a single run.
+    """
+    digests: dict[Path, str] = {}
+    inputs: FrameInputs | None = None
+    state: dict[Path, tuple[int, int] | None] = {}
+    previous: dict[Path, tuple[int, int] | None] | None = None
+    shared_frames: dict[str, SharedFrame] = {}
+    exported_devices: str | None = None
+    exports = itertools.count()
+
+    if memory_budget is not None and jobs > 1:
+        # The pool outlives config changes, so size it for every device
+        try:
+            config = load_config(config_file)
+        except (KeyError, OSError, ValueError):
+            # Reported by the first pass
+            pass
+        else:
+            manifest = FrameManifest.load(
+                frame_output_folder(config, options) / MANIFEST_NAME
+            )
+            jobs = memory_limited_jobs(
+                jobs,
+                memory_budget,
+                config.devices,
+                manifest.footprints,
+                config_file.parent,
+                options,
+            )
+
+    def start_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_worker, initargs=(options,)
+        )
+
+    with tempfile.TemporaryDirectory(prefix="swpngx-frames-") as tmp:
+
+        def reframe() -> None:
+            nonlocal inputs, shared_frames, exported_devices, force
+            inputs = load_frame_inputs(config_file)
+            config = inputs.config
+            output_folder = frame_output_folder(config, options)
+            output_folder.mkdir(parents=True, exist_ok=True)
+            manifest_file = output_folder / MANIFEST_NAME
+            manifest = FrameManifest.load(manifest_file)
+            if force:
+                manifest.outputs.clear()
+                force = False
+
+            layout_cache = LayoutCache.load(output_folder / LAYOUT_CACHE_NAME)
+
+            files = collect_input_files([config.input_folder])
+            planned, pending = plan_frames(inputs, files, manifest, digests, options)
+            prune_stale_outputs(
+                manifest,
+                output_folder,
+                {name for _, name, _ in planned.values()},
+            )
+            if not pending:
+                manifest.save(manifest_file)
+                update_delivery(output_folder, manifest, options)
+                return
+
+            fingerprint = input_fingerprint(inputs, digests)
+            if fingerprint["devices"] != exported_devices:
+                # Workers may still map the previous copies, so export new ones
+                shared_frames, exported_devices = {}, fingerprint["devices"]
+            missing = {
+                job.device.name: config_file.parent / job.device.frame_path
+                for job, _, _ in (planned[file] for file in pending)
+                if job.device.name not in shared_frames
+            }
+            if missing:
+                directory = Path(tmp) / str(next(exports))
+                directory.mkdir()
+                shared_frames = {
+                    **shared_frames,
+                    **export_frames(missing, directory),
+                }
+
+            results: list[EncodeResult] = []
+
+            def record(file: Path, result: EncodeResult) -> None:
+                _, name, key = planned[file]
+                manifest.outputs[name] = key
+                results.append(result)
+
+            start = time.perf_counter()
+            try:
+                stats = dispatch_batches(
+                    executor,
+                    WorkerInputs(
+                        config_file=config_file,
+                        string_catalog_file=inputs.string_catalog_file,
+                        font_file=inputs.font_file,
+                        shared_frames=shared_frames,
+                        fingerprint=fingerprint,
+                        layouts=layout_cache.layouts,
+                    ),
+                    [planned[file][0] for file in pending],
+                    chunk_size or math.ceil(len(pending) / (jobs * 2)),
+                    record,
+                )
+                manifest.footprints.update(stats.footprints)
+                layout_cache.touch(stats.layouts)
+                layout_cache.save(output_folder / LAYOUT_CACHE_NAME)
+            finally:
+                manifest.save(manifest_file)
+            log_encode_summary(options, results)
+            log_pipeline_summary(stats, time.perf_counter() - start)
+            update_delivery(output_folder, manifest, options)
+
+        executor = start_pool()
+        console.log(f"Watching inputs of {config_file.name}, press Ctrl+C to stop")
+        try:
+            while True:
+                folder = inputs.config.input_folder if inputs else None
+                files = collect_input_files([folder]) if folder else []
+                current = watched_files(config_file, inputs, files)
+                # Wait for changed files to settle for one interval, so files
+                # that are still being written are not read half way
+                if current != state and current == previous:
+                    for path in current.keys() | state.keys():
+                        if current.get(path) != state.get(path):
+                            digests.pop(path.resolve(), None)
+                    try:
+                        reframe()
+                    except (KeyError, OSError, ValueError) as error:
+                        console.log(f"[red]{error}")
+                    except BrokenExecutor as error:
+                        # A worker died (out of memory, a crash in a codec);
+                        # the pool is unusable, so start a fresh one
+                        console.log(f"[red]Worker pool failed: {error}, restarting it")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = start_pool()
+                    except Exception:
+                        # A bug in one pass must not end the watch
+                        console.print_exception()
+                    else:
+                        console.log("[green]Up to date, watching for changes")
+                    # Start watching inputs the pass added (a new catalog, bezel or
+                    # font) as they are now; a change to anything else during the
+                    # pass is picked up by the next poll.
+                    folder = inputs.config.input_folder if inputs else None
+                    files = collect_input_files([folder]) if folder else []
+                    state = {**watched_files(config_file, inputs, files), **current}
+                previous = current
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            console.log("Stopped watching")
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
 def get_device_name(name: str):
     # Expected format: {device_name}-{index:02d}_{step_name}
     # Example: iPhone_16_Pro-01_documents
     # We need to extract everything before the last hyphen followed by digits
-    match = re.match(r"^(.+)-\d+_", name)
+    match = DEVICE_NAME_PATTERN.match(name)
     if match:
         return match.group(1)
     # Fallback to old behavior
@@ -446,162 +1758,728 @@ def color_as_rgb(color: str) -> tuple[int, int, int]:
     return tuple(int(color[i : i + 2], 16) for i in (0, 2, 4))
 
 
-def make_shadow(image: Image.Image, blur: int, color: str) -> Image.Image:
-    shadow = image.copy()
-    data = numpy.asarray(shadow).copy()
-    r, g, b = color_as_rgb(color)
-    data[:, :, 0] = r
-    data[:, :, 1] = g
-    data[:, :, 2] = b
+def make_shadow(
+    alpha: Image.Image, blur: float, color: str, passes: int = 1, downscale: int = 1
+) -> Image.Image:
+    """Tint a Gaussian-blurred copy of an L-mode silhouette with ``color``.
+
+    With ``downscale > 1`` the blur runs on a reduced copy of the silhouette
+    which is upsampled again afterwards; this is much cheaper for large blurs
+    and visually equivalent to the full resolution result.
+    """
+    size = alpha.size
+    if downscale > 1:
+        alpha = alpha.reduce(downscale)
+        blur = blur / downscale
+    for _ in range(passes):
+        alpha = alpha.filter(ImageFilter.GaussianBlur(blur))
+    if downscale > 1:
+        alpha = alpha.resize(size, Image.Resampling.BILINEAR)
 
-    image = Image.fromarray(data, "RGBA")
-    image = image.filter(ImageFilter.GaussianBlur(blur))
-    return image
+    shadow = Image.new("RGBA", size, color)
+    shadow.putalpha(alpha)
+    return shadow
 
 
-def drop_shadow(image: Image.Image, blur: int, color: str, debug: bool) -> Image.Image:
-    shadow = make_shadow(image, blur, color)
-    shadow = shadow.filter(ImageFilter.GaussianBlur(blur))
+def drop_shadow(
+    image: Image.Image, blur: int, color: str, debug: bool, downscale: int = 1
+) -> Image.Image:
+    alpha = image.getchannel("A")
+    shadow = make_shadow(alpha, blur, color, passes=2, downscale=downscale)
 
     result = Image.new("RGBA", image.size)
     result.alpha_composite(shadow)
     result.alpha_composite(image)
 
     if debug:
-        debug_shadow = make_shadow(image, 0, "#ff0000")
+        debug_shadow = make_shadow(alpha, 0, "#ff0000")
         result.alpha_composite(debug_shadow)
 
     return result
 
 
-def frame(
+def build_shadow_layer(
+    template: FrameTemplate,
+    device: DeviceConfig,
+    color: str,
+    downscale: int = 1,
+) -> Image.Image:
+    """Drop shadow of the device silhouette, ready to composite the device onto."""
+    shadow = make_shadow(
+        template.silhouette,
+        device.shadow_blur,
+        color,
+        passes=2,
+        downscale=downscale,
+    )
+    layer = Image.new("RGBA", template.output_size)
+    layer.alpha_composite(shadow)
+    return layer
+
+
+def shadow_layer(
+    template: FrameTemplate,
+    device: DeviceConfig,
+    color: str,
+    downscale: int = 1,
+) -> Image.Image:
+    key = (device.name, device.shadow_blur, color, tuple(device.post_offset), downscale)
+    if key not in _SHADOWS:
+        _SHADOWS[key] = build_shadow_layer(template, device, color, downscale)
+    return _SHADOWS[key]
+
+
+def build_frame_template(
+    device: DeviceConfig,
+    style: ScreenStyle,
+    resample: Image.Resampling | None = None,
+) -> FrameTemplate:
+    if device.frame is None:
+        raise ValueError(f"Frame image not loaded for {device.name}")
+
+    mask = Image.new("L", device.frame.size)
+    x, y = device.offset
+    x -= device.mask_margin
+    y -= device.mask_margin
+    w, h = device.target_size
+    w += device.mask_margin * 2
+    h += device.mask_margin * 2
+    r = device.mask_corner_radius
+    round_rect(x, y, w, h, r, ImageDraw.Draw(mask), fill=255)
+    # Outside the screenshot the pasted canvas is transparent, so only the part
+    # of the mask covering the screenshot itself matters.
+    screen_box = (*device.offset, *(device.offset + device.target_size))
+    mask = mask.crop(screen_box)
+
+    output_size = (device.target_size.x, device.target_size.y)
+    frame_w, frame_h = device.frame.size
+    aspect_ratio = frame_w / frame_h
+    device_sizes = [(output_size[0], int(output_size[0] / aspect_ratio))]
+    if device.post_margin:
+        aspect_ratio = device_sizes[0][0] / device_sizes[0][1]
+        new_w = device_sizes[0][0] - device.post_margin * 2
+        device_sizes.append((new_w, int(new_w / aspect_ratio)))
+
+    device_w, device_h = device_sizes[-1]
+    placement = (
+        (output_size[0] - device_w) // 2 + device.post_offset.x,
+        (output_size[1] - device_h) // 2 + device.post_offset.y,
+    )
+
+    silhouette = Image.new("RGBA", device.frame.size)
+    silhouette.paste((255, 255, 255, 255), box=screen_box, mask=mask)
+    silhouette.alpha_composite(device.frame)
+    for size in device_sizes:
+        silhouette = silhouette.resize(size, resample)
+    placed = Image.new("RGBA", output_size)
+    placed.paste(silhouette, box=placement)
+
+    return FrameTemplate(
+        frame=device.frame,
+        mask=mask,
+        screen_origin=(device.offset.x, device.offset.y),
+        device_sizes=device_sizes,
+        placement=placement,
+        background=Image.new("RGBA", output_size, style.background_color),
+        silhouette=placed.getchannel("A"),
+    )
+
+
+def frame_template(
+    device: DeviceConfig,
+    style: ScreenStyle,
+    resample: Image.Resampling | None = None,
+) -> FrameTemplate:
+    key = (device.name, style.background_color, resample)
+    if key not in _TEMPLATES:
+        _TEMPLATES[key] = build_frame_template(device, style, resample)
+    return _TEMPLATES[key]
+
+
+def render_title_tile(
+    title: str,
+    locale: str,
+    font_file: Path,
+    style: ScreenStyle,
+    max_width: int,
+) -> TitleTile | None:
+    layout = title_layout(title, locale, font_file, style, max_width)
+    font = load_font(font_file, layout.size, "Bold")
+    text = "\n".join(line.text for line in layout.lines)
+
+    with stage("text_draw"):
+        measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        left, top, right, bottom = measure.multiline_textbbox(
+            (0, 0), text, font=font, spacing=style.font_spacing
+        )
+        left, top = math.floor(left), math.floor(top)
+        right, bottom = math.ceil(right), math.ceil(bottom)
+        if right <= left or bottom <= top:
+            return None
+
+        image = Image.new("RGBA", (right - left, bottom - top))
+        ImageDraw.Draw(image).multiline_text(
+            (-left, -top),
+            text,
+            fill=style.text_color,
+            font=font,
+            spacing=style.font_spacing,
+        )
+    return TitleTile(image=image, offset=(left, top))
+
+
+def title_layout(
+    title: str,
+    locale: str,
+    font_file: Path,
+    style: ScreenStyle,
+    max_width: int,
+) -> TitleLayout:
+    """Size and wrapped lines of a title, reused from earlier runs if known."""
+    key = layout_key(
+        {
+            "title": title,
+            "locale": locale,
+            "font": cached_digest(font_file, _FONT_DIGESTS),
+            "size": style.text_size,
+            "fit": style.text_fit.model_dump(mode="json") if style.text_fit else None,
+            "max_width": max_width,
+            "hyphenate": style.text_hyphenate,
+            "strategy": style.text_wrap.value,
+            **layout_engines(),
+        }
+    )
+    layout = _LAYOUTS.get(key)
+    if layout is None:
+        # Pixel-based wrapping with hyphenation
+        wrap_config = TextWrapConfig(
+            max_width=max_width,
+            hyphenate=style.text_hyphenate,
+            strategy=style.text_wrap,
+        )
+        with stage("text_fit"):
+            size = title_text_size(title, locale, font_file, style, wrap_config)
+        with stage("text_wrap"):
+            lines = wrap_text_pixel(
+                title, load_font(font_file, size, "Bold"), wrap_config, locale=locale
+            )
+        layout = _LAYOUTS[key] = TitleLayout(size=size, lines=lines)
+    _USED_LAYOUTS[key] = layout
+    return layout
+
+
+def title_text_size(
+    title: str,
+    locale: str,
+    font_file: Path,
+    style: ScreenStyle,
+    wrap_config: TextWrapConfig,
+) -> int:
+    """The style's text size, or with text_fit the largest size the title fits."""
+    fit = style.text_fit
+    if fit is None:
+        return style.text_size
+    return fit_text_size(
+        title,
+        font_file,
+        wrap_config,
+        max_lines=fit.max_lines,
+        min_size=fit.min_size,
+        max_size=fit.max_size or style.text_size,
+        locale=locale,
+        variation="Bold",
+    )
+
+
+def text_fit_problem(style: ScreenStyle) -> str | None:
+    """Why ``text_fit`` has no sizes to pick from, if it has none.
+
+    TextFit checks an explicit max_size itself, but without one the maximum
+    is the text_size of the merged style, known only once styles are merged.
+    """
+    fit = style.text_fit
+    if fit is None or fit.max_size is not None or fit.min_size <= style.text_size:
+        return None
+    return (
+        f"text_fit min_size {fit.min_size} is above text_size {style.text_size}, "
+        "its max_size"
+    )
+
+
+def title_max_width(device: DeviceConfig, style: ScreenStyle) -> int:
+    """Width titles wrap to: explicit, or the frame width less offset and margin."""
+    return style.text_max_width or calculate_text_max_width(
+        image_width=device.target_size.x,
+        text_offset_x=style.text_offset.x,
+        text_margin=style.text_margin,
+    )
+
+
+def title_tile(
+    title: str,
+    locale: str,
+    font_file: Path,
+    style: ScreenStyle,
+    max_width: int,
+) -> TitleTile | None:
+    key = (
+        title,
+        locale,
+        str(font_file),
+        style.text_size,
+        style.font_spacing,
+        style.text_hyphenate,
+        style.text_wrap,
+        style.text_fit,
+        max_width,
+        style.text_color,
+    )
+    if key not in _TITLE_TILES:
+        _TITLE_TILES[key] = render_title_tile(
+            title, locale, font_file, style, max_width
+        )
+    return _TITLE_TILES[key]
+
+
+def tile_position(tile: TitleTile, text_offset: tuple[int, int]) -> tuple[int, int]:
+    return (text_offset[0] + tile.offset[0], text_offset[1] + tile.offset[1])
+
+
+def composite_tile(
+    output: Image.Image, tile: TitleTile | None, text_offset: tuple[int, int]
+) -> None:
+    """Alpha-composite a title tile onto ``output``, clipped to its bounds."""
+    if tile is None:
+        return
+    x, y = tile_position(tile, text_offset)
+    src_x, src_y = max(0, -x), max(0, -y)
+    dest_x, dest_y = max(0, x), max(0, y)
+    width = min(tile.image.width - src_x, output.width - dest_x)
+    height = min(tile.image.height - src_y, output.height - dest_y)
+    if width <= 0 or height <= 0:
+        return
+    output.alpha_composite(
+        tile.image,
+        dest=(dest_x, dest_y),
+        source=(src_x, src_y, src_x + width, src_y + height),
+    )
+
+
+def device_layers(
+    template: FrameTemplate,
+    device: DeviceConfig,
+    style: ScreenStyle,
+    resample: Image.Resampling | None = None,
+    shadow_downscale: int = 1,
+) -> DeviceLayers:
+    """Layers for the NumPy compositor, with the bezel scaled to output size."""
+    key = (device.name, style.background_color, style.shadow_color, resample)
+    if key in _LAYERS:
+        return _LAYERS[key]
+
+    bezel = template.frame
+    for size in template.device_sizes:
+        bezel = bezel.resize(size, resample)
+    scale_x = bezel.width / template.frame.width
+    scale_y = bezel.height / template.frame.height
+    x, y = template.placement
+    screen_x, screen_y = template.screen_origin
+    screen_w, screen_h = template.mask.size
+    # Whole output pixels inside the scaled screen, and where they sample from
+    left = math.ceil(screen_x * scale_x)
+    top = math.ceil(screen_y * scale_y)
+    right = math.floor((screen_x + screen_w) * scale_x)
+    bottom = math.floor((screen_y + screen_h) * scale_y)
+    screen_inner = (x + left, y + top, x + right, y + bottom)
+    screen_source = (
+        max(0.0, left / scale_x - screen_x),
+        max(0.0, top / scale_y - screen_y),
+        min(float(screen_w), right / scale_x - screen_x),
+        min(float(screen_h), bottom / scale_y - screen_y),
+    )
+    # Output pixels the screen covers at least partly. The Pillow path scales
+    # screen and bezel in one go, so the screen weighs in where the bezel
+    # does not cover it; scale that weight like the bezel.
+    outer = (
+        math.floor(screen_x * scale_x),
+        math.floor(screen_y * scale_y),
+        math.ceil((screen_x + screen_w) * scale_x),
+        math.ceil((screen_y + screen_h) * scale_y),
+    )
+    screen_box = (x + outer[0], y + outer[1], x + outer[2], y + outer[3])
+    mask = Image.new("L", template.frame.size)
+    mask.paste(template.mask, box=template.screen_origin)
+    mask = ImageChops.multiply(mask, ImageChops.invert(template.frame.getchannel("A")))
+    for size in template.device_sizes:
+        mask = mask.resize(size, resample)
+
+    _LAYERS[key] = build_device_layers(
+        size=template.output_size,
+        background_color=style.background_color,
+        shadow=shadow_layer(template, device, style.shadow_color, shadow_downscale),
+        bezel=bezel,
+        bezel_origin=template.placement,
+        screen_mask=mask.crop(outer),
+        screen_box=screen_box,
+        screen_inner=screen_inner,
+        screen_source=screen_source,
+        resample=resample,
+    )
+    return _LAYERS[key]
+
+
+def resolve_frame_job(
     file: Path,
     config: Config,
     output_dir: Path,
     titles: dict[str, dict[str, str]],
-    font_file: Path,
-):
-    console.log(f"Framing {file}")
+    suffix: str = ".png",
+) -> FrameJob | None:
     device_name = get_device_name(file.stem)
     locale = get_language(file)
     locale_normalized = locale.replace("_", "-")
     normalized_locale = LANGUAGE_OVERRIDES.get(locale_normalized, locale_normalized)
     lang_code = normalized_locale.split("-")[0]
 
-    console.log(f" - Device: {device_name} | Locale: {locale}")
-
     try:
         frame_config = config[device_name]
     except KeyError:
-        console.log(" - No frame config found")
-        return
-    if frame_config.frame is None:
-        raise ValueError(f"Frame image not loaded for {device_name}")
+        return None
 
     screen_config, screen_style = config.load_screen_config(device_name, file)
 
-    screenshot_raw = Image.open(file).convert("RGBA")
-    screenshot_raw = screenshot_raw.resize([*frame_config.target_size])
+    title = None
+    if title_key := screen_config.title_key:
+        if title_key not in titles:
+            raise KeyError(f"Missing localization key: {title_key}")
+        if lang_code not in titles[title_key]:
+            raise KeyError(f"Missing localization for {title_key} ({lang_code})")
+        title = titles[title_key][lang_code]
+
+    return FrameJob(
+        file=file,
+        device=frame_config,
+        screen=screen_config,
+        style=screen_style,
+        title=title,
+        locale=normalized_locale,
+        output_file=output_dir / frame_output_name(file, suffix),
+    )
 
-    screenshot = Image.new("RGBA", frame_config.frame.size)
-    screenshot.paste(screenshot_raw, box=[*frame_config.offset])
 
-    buffer = Image.new("RGBA", frame_config.frame.size)
+def frame_output_folder(config: Config, options: FrameOptions) -> Path:
+    """Where framed screenshots go; drafts are kept apart from final output."""
+    if options.quality is Quality.draft:
+        return config.output_folder.with_name(f"{config.output_folder.name}-draft")
+    return config.output_folder
 
-    mask = Image.new("RGBA", frame_config.frame.size)
-    x, y = frame_config.offset
-    x -= frame_config.mask_margin
-    y -= frame_config.mask_margin
-    w, h = frame_config.target_size
-    w += frame_config.mask_margin * 2
-    h += frame_config.mask_margin * 2
-    r = frame_config.mask_corner_radius
-    round_rect(x, y, w, h, r, ImageDraw.Draw(mask), fill="red")
 
-    buffer.paste(screenshot, mask=mask)
-    buffer.alpha_composite(frame_config.frame)
+def frame_output_name(file: Path, suffix: str = ".png") -> str:
+    """Output path of ``file``, relative to the output folder."""
+    output_locale = normalize_output_locale(get_language(file))
+    return f"{output_locale}/{file.stem}-framed{suffix}"
 
-    # resize to original device screenshot size to comply with AppStore requirements
-    output = Image.new("RGBA", screenshot_raw.size)
-    output_draw = ImageDraw.Draw(output)
-    output_draw.rectangle([0, 0, *output.size], fill=screen_style.background_color)
 
-    font = ImageFont.truetype(str(font_file), screen_style.text_size)
-    try:
-        font.set_variation_by_name("Bold")
-    except (AttributeError, OSError, ValueError):
-        pass
+def composite_pillow(
+    job: FrameJob,
+    template: FrameTemplate,
+    screenshot: Image.Image,
+    tile: TitleTile | None,
+    opaque: bool,
+    resample: Image.Resampling | None = None,
+    shadow_downscale: int = 1,
+) -> Image.Image:
+    frame_config = job.device
+    screen_style = job.style
 
-    if title_key := screen_config.title_key:
-        text_buffer = Image.new("RGBA", screenshot_raw.size)
-        text_buffer_draw = ImageDraw.Draw(text_buffer)
-        if title_key not in titles:
-            console.log(f"[red]Missing localization key: {title_key}")
-            raise KeyError(title_key)
-        if lang_code not in titles[title_key]:
-            console.log(f"[red]Missing localization for {title_key} ({lang_code})")
-            raise KeyError(f"{title_key}:{lang_code}")
-        title = titles[title_key][lang_code]
+    with stage("mask"):
+        buffer = Image.new("RGBA", template.frame.size)
+        buffer.paste(screenshot, box=template.screen_origin, mask=template.mask)
+    with stage("bezel_composite"):
+        buffer = Image.alpha_composite(buffer, template.frame)
 
-        # Calculate max width (explicit or auto from image dimensions)
-        text_max_width = screen_style.text_max_width or calculate_text_max_width(
-            image_width=output.size[0],
-            text_offset_x=screen_style.text_offset.x,
-            text_margin=screen_style.text_margin,
+    # resize to original device screenshot size to comply with AppStore requirements
+    with stage("composite"):
+        output = template.background.copy()
+        composite_tile(output, tile, screen_style.text_offset)
+
+    with stage("resize_to_output"):
+        for size in template.device_sizes:
+            buffer = buffer.resize(size, resample)
+
+    with stage("shadow"):
+        if opaque:
+            # The silhouette only depends on the device for opaque screenshots
+            shadow = shadow_layer(
+                template, frame_config, screen_style.shadow_color, shadow_downscale
+            )
+            framed = shadow.copy()
+        else:
+            offset_buffer = Image.new("RGBA", output.size)
+            offset_buffer.paste(buffer, box=template.placement)
+            framed = drop_shadow(
+                offset_buffer,
+                frame_config.shadow_blur,
+                color=screen_style.shadow_color,
+                debug=False,
+                downscale=shadow_downscale,
+            )
+    with stage("composite"):
+        if opaque:
+            # Transparent pixels leave the destination as is, so compositing the
+            # device at its placement equals compositing it pasted onto an
+            # empty output-size canvas, without allocating that canvas
+            framed.alpha_composite(buffer, dest=template.placement)
+        del buffer
+        output.alpha_composite(framed)
+    return output
+
+
+def draft_size(point: Point) -> tuple[int, int]:
+    return (max(1, point.x // DRAFT_SCALE), max(1, point.y // DRAFT_SCALE))
+
+
+def scale_point(point: Point) -> Point:
+    return Point((round(point.x / DRAFT_SCALE), round(point.y / DRAFT_SCALE)))
+
+
+def draft_device(device: DeviceConfig) -> DeviceConfig:
+    """``device`` with its geometry and bezel reduced by DRAFT_SCALE."""
+    if device.frame is None:
+        raise ValueError(f"Frame image not loaded for {device.name}")
+    if device.name not in _DRAFT_DEVICES:
+        _DRAFT_DEVICES[device.name] = device.model_copy(
+            update={
+                "frame": device.frame.reduce(DRAFT_SCALE),
+                "offset": scale_point(device.offset),
+                "post_offset": scale_point(device.post_offset),
+                "post_margin": round(device.post_margin / DRAFT_SCALE),
+                "target_size": Point(draft_size(device.target_size)),
+                "mask_corner_radius": round(device.mask_corner_radius / DRAFT_SCALE),
+                "mask_margin": round(device.mask_margin / DRAFT_SCALE),
+                "shadow_blur": max(1, round(device.shadow_blur / DRAFT_SCALE)),
+            }
         )
-
-        # Pixel-based wrapping with hyphenation
-        wrap_config = TextWrapConfig(
-            max_width=text_max_width,
-            hyphenate=screen_style.text_hyphenate,
+    return _DRAFT_DEVICES[device.name]
+
+
+def draft_style(style: ScreenStyle) -> ScreenStyle:
+    """``style`` with its text metrics reduced by DRAFT_SCALE."""
+    max_width = style.text_max_width
+    fit = style.text_fit
+    if fit is not None:
+        fit = TextFit(
+            max_lines=fit.max_lines,
+            min_size=max(1, round(fit.min_size / DRAFT_SCALE)),
+            max_size=max(1, round((fit.max_size or style.text_size) / DRAFT_SCALE)),
         )
-        wrapped_lines = wrap_text_pixel(
-            title, font, wrap_config, locale=normalized_locale
+    return ScreenStyle(
+        background_color=style.background_color,
+        text_color=style.text_color,
+        text_offset=scale_point(style.text_offset),
+        text_size=max(1, round(style.text_size / DRAFT_SCALE)),
+        text_max_width=round(max_width / DRAFT_SCALE) if max_width else None,
+        text_margin=round(style.text_margin / DRAFT_SCALE),
+        text_hyphenate=style.text_hyphenate,
+        text_wrap=style.text_wrap,
+        text_fit=fit,
+        font_spacing=max(1, round(style.font_spacing / DRAFT_SCALE)),
+        shadow_color=style.shadow_color,
+    )
+
+
+def draft_job(job: FrameJob) -> FrameJob:
+    """Scale a job down for a draft preview.
+
+    Device geometry, bezel and text are reduced by DRAFT_SCALE, so the rest of
+    the pipeline runs unchanged on a sixteenth of the pixels.
+    """
+    return replace(job, device=draft_device(job.device), style=draft_style(job.style))
+
+
+def job_tags(job: FrameJob) -> dict[str, str]:
+    """Trace tags for the screenshot a job frames."""
+    return {
+        "device": job.device.name,
+        "locale": get_language(job.file),
+        "step": job.file.stem.removeprefix(f"{job.device.name}-"),
+    }
+
+
+def read_screenshot(
+    job: FrameJob, options: FrameOptions = FrameOptions()
+) -> Image.Image:
+    """Decode a screenshot and scale it to the device's target size."""
+    with tagged(**job_tags(job)), stage("read"):
+        if options.quality is Quality.draft:
+            with stage("decode"):
+                # PNG cannot decode at reduced size, but everything after the
+                # decode can run on the reduced image
+                screenshot = Image.open(job.file)
+                if screenshot.mode not in REDUCIBLE_MODES:
+                    screenshot = screenshot.convert("RGBA")
+                screenshot = screenshot.reduce(DRAFT_SCALE).convert("RGBA")
+            with stage("resize"):
+                return screenshot.resize(
+                    draft_size(job.device.target_size), options.resample
+                )
+        with stage("decode"):
+            screenshot = Image.open(job.file).convert("RGBA")
+        with stage("resize"):
+            return screenshot.resize([*job.device.target_size])
+
+
+def compose_frame(
+    job: FrameJob,
+    screenshot: Image.Image,
+    font_file: Path,
+    options: FrameOptions = FrameOptions(),
+) -> Image.Image:
+    if options.quality is Quality.draft:
+        job = draft_job(job)
+    frame_config = job.device
+    screen_style = job.style
+    with tagged(**job_tags(job)), stage("compose"):
+        console.log(f"Framing {job.file}")
+        console.log(
+            f" - Device: {frame_config.name} | Locale: {get_language(job.file)}"
         )
-        title = "\n".join(line.text for line in wrapped_lines)
 
-        text_buffer_draw.multiline_text(
-            [*screen_style.text_offset],
-            title,
-            fill=screen_style.text_color,
-            font=font,
-            spacing=screen_style.font_spacing,
+        if frame_config.frame is None:
+            raise ValueError(f"Frame image not loaded for {frame_config.name}")
+
+        with stage("template"):
+            template = frame_template(frame_config, screen_style, options.resample)
+
+        opaque = screenshot.getchannel("A").getextrema() == (255, 255)
+
+        tile = None
+        if (title := job.title) is not None:
+            tile = title_tile(
+                title,
+                job.locale,
+                font_file,
+                screen_style,
+                title_max_width(frame_config, screen_style),
+            )
+
+        # The NumPy compositor needs an opaque screenshot and background; anything
+        # else takes the Pillow path
+        if (
+            options.compositor is Compositor.numpy
+            and opaque
+            and template.background.getpixel((0, 0))[3] == 255
+        ):
+            with stage("layers"):
+                layers = device_layers(
+                    template,
+                    frame_config,
+                    screen_style,
+                    options.resample,
+                    options.shadow_downscale,
+                )
+            with stage("composite"):
+                return composite(
+                    layers,
+                    screenshot,
+                    tile.image if tile else None,
+                    tile_position(tile, screen_style.text_offset) if tile else (0, 0),
+                )
+        return composite_pillow(
+            job,
+            template,
+            screenshot,
+            tile,
+            opaque,
+            options.resample,
+            options.shadow_downscale,
         )
-        output.alpha_composite(text_buffer)
-
-    aspect_ratio = buffer.size[0] / buffer.size[1]
-    target_size = (screenshot_raw.size[0], int(screenshot_raw.size[0] / aspect_ratio))
-    buffer = buffer.resize(target_size)
-
-    if frame_config.post_margin:
-        aspect_ratio = buffer.size[0] / buffer.size[1]
-        new_w = buffer.size[0] - frame_config.post_margin * 2
-        new_h = int(new_w / aspect_ratio)
-        buffer = buffer.resize((new_w, new_h))
-
-    delta_x = (output.size[0] - buffer.size[0]) // 2
-    delta_y = (output.size[1] - buffer.size[1]) // 2
-
-    offset_buffer = Image.new("RGBA", output.size)
-    offset_buffer.paste(
-        buffer,
-        box=[
-            delta_x + frame_config.post_offset[0],
-            delta_y + frame_config.post_offset[1],
-        ],
-    )
 
-    offset_buffer = drop_shadow(
-        offset_buffer,
-        frame_config.shadow_blur,
-        color=screen_style.shadow_color,
-        debug=False,
-    )
-    output.alpha_composite(offset_buffer)
-
-    output_locale = normalize_output_locale(locale)
-    locale_dir = output_dir / output_locale
-    locale_dir.mkdir(parents=True, exist_ok=True)
-    output_file = locale_dir / f"{file.stem}-framed.png"
-    console.log(f"Saving to {output_file}")
-    output.save(output_file)
+
+def write_frame(
+    job: FrameJob, output: Image.Image, options: FrameOptions = FrameOptions()
+) -> EncodeResult:
+    with tagged(**job_tags(job)), stage("write"):
+        output_file = job.output_file
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        console.log(f"Saving to {output_file}")
+        with stage("encode"):
+            return encode(output, output_file, options.encode, options.jpeg_quality)
+
+
+def frame(
+    job: FrameJob, font_file: Path, options: FrameOptions = FrameOptions()
+) -> EncodeResult:
+    with tagged(**job_tags(job)), stage("frame"):
+        screenshot = read_screenshot(job, options)
+        output = compose_frame(job, screenshot, font_file, options)
+        return write_frame(job, output, options)
+
+
+def frame_pipeline(
+    jobs: list[FrameJob],
+    font_file: Path,
+    options: FrameOptions,
+    on_result: Callable[[Path, EncodeResult], None],
+) -> PipelineStats:
+    """Frame ``jobs`` with decoding and encoding overlapped with compositing.
+
+    A reader thread decodes up to ``options.queue_depth`` screenshots ahead and
+    a writer thread encodes and writes up to ``options.queue_depth`` finished
+    frames behind; compositing waits when either window is exhausted. Pillow
+    releases the GIL while decoding and encoding, so the stages run in parallel.
+    """
+    stats = PipelineStats()
+    start = time.perf_counter()
+    depth = options.queue_depth
+
+    def read(job: FrameJob) -> tuple[Image.Image, float]:
+        begin = time.perf_counter()
+        screenshot = read_screenshot(job, options)
+        return screenshot, time.perf_counter() - begin
+
+    def write(job: FrameJob, output: Image.Image) -> tuple[EncodeResult, float]:
+        begin = time.perf_counter()
+        result = write_frame(job, output, options)
+        return result, time.perf_counter() - begin
+
+    def collect(job: FrameJob, future: Future) -> None:
+        result, seconds = future.result()
+        stats.write += seconds
+        stats.files += 1
+        on_result(job.file, result)
+
+    upcoming = iter(jobs)
+    reads: deque[tuple[FrameJob, Future]] = deque()
+    writes: deque[tuple[FrameJob, Future]] = deque()
+    with ThreadPoolExecutor(1, thread_name_prefix="swpngx-read") as readers:
+        with ThreadPoolExecutor(1, thread_name_prefix="swpngx-write") as writers:
+            for job in itertools.islice(upcoming, depth):
+                reads.append((job, readers.submit(read, job)))
+            while reads:
+                job, future = reads.popleft()
+                waited = time.perf_counter()
+                screenshot, seconds = future.result()
+                stats.starved += time.perf_counter() - waited
+                stats.read += seconds
+                if (next_job := next(upcoming, None)) is not None:
+                    reads.append((next_job, readers.submit(read, next_job)))
+
+                begin = time.perf_counter()
+                output = compose_frame(job, screenshot, font_file, options)
+                stats.compose += time.perf_counter() - begin
+                del screenshot
+
+                waited = time.perf_counter()
+                while len(writes) >= depth:
+                    collect(*writes.popleft())
+                stats.blocked += time.perf_counter() - waited
+                writes.append((job, writers.submit(write, job, output)))
+                del output
+            while writes:
+                collect(*writes.popleft())
+
+    stats.layouts = dict(_USED_LAYOUTS)
+    _USED_LAYOUTS.clear()
+    stats.wall = time.perf_counter() - start
+    return stats
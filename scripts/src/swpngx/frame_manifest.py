@@ -0,0 +1,174 @@
+"""Content-addressed manifest of framed screenshot outputs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel, Field, ValidationError
+
+MANIFEST_NAME = ".frame-manifest.json"
+MANIFEST_VERSION = 1
+
+# Bump when the framing pipeline changes its pixel output so that every cached
+# entry is invalidated on the next run.
+FRAME_KEY_VERSION = 3
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Part ``index`` (1-based) of ``count`` of the framing plan, see --shard."""
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, text: str) -> "Shard":
+        index, _, count = text.partition("/")
+        try:
+            shard = cls(int(index), int(count))
+        except ValueError:
+            raise ValueError(f"Invalid shard {text!r}, expected e.g. 2/4") from None
+        if not 1 <= shard.index <= shard.count:
+            raise ValueError(f"Invalid shard {text!r}, expected 1 <= i <= n in i/n")
+        return shard
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def contains(self, device: str, locale: str, step: str) -> bool:
+        """Stable across runs, machines and Python versions (unlike ``hash``)."""
+        digest = hashlib.sha256(f"{device}\0{locale}\0{step}".encode("utf-8"))
+        return int.from_bytes(digest.digest()[:8], "big") % self.count == self.index - 1
+
+
+class ShardRecord(BaseModel):
+    """The part of the framing plan a sharded run was responsible for."""
+
+    index: int
+    count: int
+    # Hash of the output names of the whole plan, the same for all its shards
+    plan: str
+    total: int
+    outputs: list[str]
+
+
+def plan_digest(names: set[str]) -> str:
+    return hashlib.sha256("\n".join(sorted(names)).encode("utf-8")).hexdigest()
+
+
+class FrameManifest(BaseModel):
+    """Maps output paths (relative to the output folder) to their frame key."""
+
+    version: int = MANIFEST_VERSION
+    outputs: dict[str, str] = Field(default_factory=dict)
+    # Peak worker RSS in bytes measured while framing each device, used to
+    # size the worker pool for --max-memory
+    footprints: dict[str, int] = Field(default_factory=dict)
+    # Set by runs with --shard, for joining them with "frame merge"
+    shard: ShardRecord | None = None
+
+    @classmethod
+    def load(cls, path: Path) -> "FrameManifest":
+        if not path.is_file():
+            return cls()
+        try:
+            manifest = cls.model_validate_json(path.read_text(encoding="utf-8"))
+        except (ValidationError, ValueError):
+            return cls()
+        if manifest.version != MANIFEST_VERSION:
+            return cls()
+        return manifest
+
+    def save(self, path: Path) -> None:
+        data = self.model_dump(mode="json")
+        data["outputs"] = dict(sorted(self.outputs.items()))
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_key(components: dict[str, object]) -> str:
+    """Hash JSON-serializable key components into a stable frame key."""
+    payload = json.dumps(
+        {"key_version": FRAME_KEY_VERSION, **components},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def merge_shard_manifests(
+    manifests: dict[Path, "FrameManifest"],
+) -> tuple["FrameManifest", list[str]]:
+    """Join the manifests of sharded runs and check they cover one whole plan.
+
+    Returns the merged manifest, covering exactly the outputs of the plan, and
+    every problem found: manifests of unsharded runs, shards of different plans,
+    missing or repeated shards, and outputs a shard did not produce.
+    """
+    errors: list[str] = []
+    merged = FrameManifest()
+    records: dict[Path, ShardRecord] = {}
+    for path, manifest in manifests.items():
+        if manifest.shard is None:
+            errors.append(f"{path}: not written by a run with --shard")
+        else:
+            records[path] = manifest.shard
+    if not records:
+        return merged, errors
+
+    first = next(iter(records.values()))
+    seen: dict[int, Path] = {}
+    owners: dict[str, Path] = {}
+    for path, record in records.items():
+        if (record.count, record.plan, record.total) != (
+            first.count,
+            first.plan,
+            first.total,
+        ):
+            errors.append(
+                f"{path}: shard {record.index}/{record.count} is from a different "
+                f"plan than shard {first.index}/{first.count}"
+            )
+            continue
+        if record.index in seen:
+            errors.append(
+                f"{path}: shard {record.index}/{record.count} repeats {seen[record.index]}"
+            )
+            continue
+        seen[record.index] = path
+        manifest = manifests[path]
+        for name in record.outputs:
+            if name in owners:
+                errors.append(f"{path}: {name} was also framed by {owners[name]}")
+            elif name not in manifest.outputs:
+                errors.append(f"{path}: {name} was not framed")
+            else:
+                owners[name] = path
+                merged.outputs[name] = manifest.outputs[name]
+        for device, size in manifest.footprints.items():
+            merged.footprints[device] = max(merged.footprints.get(device, 0), size)
+
+    missing = sorted(set(range(1, first.count + 1)) - set(seen))
+    if missing:
+        errors.append(
+            "missing shard(s) "
+            + ", ".join(f"{index}/{first.count}" for index in missing)
+        )
+    elif not errors and plan_digest(set(owners)) != first.plan:
+        errors.append(
+            f"the shards framed {len(owners)} of {first.total} planned outputs"
+        )
+    return merged, errors
@@ -0,0 +1,77 @@
+"""On-disk cache of title layouts, kept across framing runs.
+
+A layout is the size a title is drawn at and its wrapped lines. Finding it
+loads a hyphenation dictionary, which takes a good part of a second per
+language and process, and with ``text_fit`` wraps the title at several sizes.
+``.layout-cache.json`` in the output folder keeps the layouts of earlier runs,
+so reframing a screenshot whose title did not change skips all of that.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from pydantic import BaseModel, Field, ValidationError
+
+from swpngx.text_wrap import WrappedLine
+
+LAYOUT_CACHE_NAME = ".layout-cache.json"
+LAYOUT_CACHE_VERSION = 1
+
+# Bump when wrapping or fitting changes the lines or sizes it picks, so that
+# every cached layout is laid out again.
+LAYOUT_KEY_VERSION = 2
+
+# Layouts kept, the least recently used are dropped first
+LAYOUT_CACHE_LIMIT = 4096
+
+
+class TitleLayout(BaseModel):
+    size: int
+    lines: list[WrappedLine]
+
+
+class LayoutCache(BaseModel):
+    """Maps layout keys to layouts, least recently used first."""
+
+    version: int = LAYOUT_CACHE_VERSION
+    layouts: dict[str, TitleLayout] = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "LayoutCache":
+        if not path.is_file():
+            return cls()
+        try:
+            cache = cls.model_validate_json(path.read_text(encoding="utf-8"))
+        except (ValidationError, ValueError):
+            return cls()
+        if cache.version != LAYOUT_CACHE_VERSION:
+            return cls()
+        return cache
+
+    def save(self, path: Path) -> None:
+        data = self.model_dump(mode="json")
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def touch(self, used: dict[str, TitleLayout]) -> None:
+        """Add or refresh the layouts a run used, dropping the oldest over the limit."""
+        for key, layout in used.items():
+            self.layouts.pop(key, None)
+            self.layouts[key] = layout
+        for key in list(self.layouts)[: max(0, len(self.layouts) - LAYOUT_CACHE_LIMIT)]:
+            del self.layouts[key]
+
+
+def layout_key(components: dict[str, object]) -> str:
+    """Hash JSON-serializable key components into a stable layout key."""
+    payload = json.dumps(
+        {"key_version": LAYOUT_KEY_VERSION, **components},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,136 @@
+"""Line break opportunities inside runs of text written without spaces.
+
+Chinese and Japanese break between most characters, and Thai and Lao between
+words that are not separated by spaces. ``line_break_offsets`` finds where a
+run without spaces may break, following the Unicode line breaking algorithm
+(UAX #14). It uses ICU when PyICU is installed, and otherwise a subset of
+the algorithm:
+
+- Ideographs, kana and fullwidth forms break on either side, but not before
+  closing punctuation, small kana, iteration marks or the prolonged sound
+  mark, and not after opening punctuation (kinsoku shori).
+- Thai and Lao need a dictionary to find word boundaries. Without ICU they
+  break between any two clusters, never before a combining mark and never
+  after a leading vowel.
+
+Runs without characters of these scripts have no break opportunities here,
+so text with spaces wraps exactly as before.
+"""
+
+from __future__ import annotations
+
+import functools
+import unicodedata
+
+try:
+    import icu
+
+    ICU_AVAILABLE = True
+except ImportError:
+    ICU_AVAILABLE = False
+    icu = None
+
+
+# Ideographic scripts, as (first, last) code points
+IDEOGRAPHIC_RANGES = [
+    (0x2E80, 0x2FDF),  # CJK radicals, Kangxi radicals
+    (0x3000, 0x303F),  # CJK symbols and punctuation
+    (0x3040, 0x30FF),  # Hiragana, Katakana
+    (0x3100, 0x312F),  # Bopomofo
+    (0x3190, 0x31FF),  # Kanbun, Bopomofo extended, CJK strokes, small Katakana
+    (0x3400, 0x4DBF),  # CJK extension A
+    (0x4E00, 0x9FFF),  # CJK unified ideographs
+    (0xF900, 0xFAFF),  # CJK compatibility ideographs
+    (0xFE30, 0xFE4F),  # CJK compatibility forms
+    (0xFF00, 0xFFEF),  # Halfwidth and fullwidth forms
+    (0x20000, 0x3FFFF),  # CJK extensions B and later
+]
+
+# Scripts that need a dictionary for word boundaries (class SA) and whose
+# clusters the fallback can find
+SOUTHEAST_ASIAN_RANGES = [
+    (0x0E00, 0x0E7F),  # Thai
+    (0x0E80, 0x0EFF),  # Lao
+]
+
+# No break after these (class OP)
+OPENING = set("([{«‘“〈《「『【〔〖〘〚〝（［｛｟｢")
+
+# No break before these (classes CL, CP, EX, IS, NS and CJ)
+CLOSING = set(")]}»’”〉》」』】〕〗〙〛〞〟）］｝｠｣")
+NO_BREAK_BEFORE = CLOSING | set(
+    "!?,.:;%‼⁇⁈⁉"
+    "、。，．：；！？％・･"
+    "ー〜～ゝゞヽヾ々〻"
+    "ぁぃぅぇぉっゃゅょゎゕゖ"
+    "ァィゥェォッャュョヮヵヶ"
+    "ㇰㇱㇲㇳㇴㇵㇶㇷㇸㇹㇺㇻㇼㇽㇾㇿ"
+    "ｧｨｩｪｫｬｭｮｯｰ"
+    "ๆฯໆ"
+)
+
+# Thai and Lao vowels written before the consonant they follow in speech
+LEADING_VOWELS = set("เแโใไເແໂໃໄ")
+
+
+def in_ranges(char: str, ranges: list[tuple[int, int]]) -> bool:
+    code = ord(char)
+    return any(first <= code <= last for first, last in ranges)
+
+
+def is_unspaced(char: str) -> bool:
+    """Whether ``char`` belongs to a script written without spaces."""
+    return in_ranges(char, IDEOGRAPHIC_RANGES) or in_ranges(
+        char, SOUTHEAST_ASIAN_RANGES
+    )
+
+
+def can_break_between(before: str, after: str) -> bool:
+    """The UAX #14 subset described above, for two adjacent characters."""
+    if after in NO_BREAK_BEFORE or before in OPENING:
+        return False
+    if unicodedata.category(after).startswith("M"):
+        return False
+    if in_ranges(before, SOUTHEAST_ASIAN_RANGES) or in_ranges(
+        after, SOUTHEAST_ASIAN_RANGES
+    ):
+        return before not in LEADING_VOWELS
+    return in_ranges(before, IDEOGRAPHIC_RANGES) or in_ranges(after, IDEOGRAPHIC_RANGES)
+
+
+@functools.cache
+def icu_line_breaker(locale: str) -> "icu.BreakIterator":
+    return icu.BreakIterator.createLineInstance(
+        icu.Locale.forLanguageTag(locale.replace("_", "-"))
+    )
+
+
+def icu_line_break_offsets(word: str, locale: str) -> list[int]:
+    breaker = icu_line_breaker(locale)
+    breaker.setText(word)
+    # ICU counts UTF-16 code units, Python code points
+    units = [0]
+    for char in word:
+        units.append(units[-1] + (2 if ord(char) > 0xFFFF else 1))
+    offsets = {unit: index for index, unit in enumerate(units)}
+    return [
+        offsets[boundary]
+        for boundary in breaker
+        if 0 < boundary < units[-1] and boundary in offsets
+    ]
+
+
+def line_break_offsets(word: str, locale: str = "en") -> list[int]:
+    """Ascending offsets inside ``word``, a run without spaces, where it may break.
+
+    Lines broken there need no hyphen.
+    """
+    if not any(map(is_unspaced, word)):
+        return []
+    if ICU_AVAILABLE:
+        return icu_line_break_offsets(word, locale)
+    return [
+        offset
+        for offset in range(1, len(word))
+        if can_break_between(word[offset - 1], word[offset])
+    ]
@@ -0,0 +1,56 @@
+"""Process memory measurement for sizing the framing worker pool."""
+
+from __future__ import annotations
+
+import re
+import resource
+import sys
+from pathlib import Path
+
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as ``6G``, ``1500M`` or ``512MiB`` (binary units) to bytes."""
+    match = _SIZE.match(text)
+    if match is None:
+        raise ValueError(f"Invalid size {text!r}, expected e.g. 6G or 1500M")
+    value, unit = match.groups()
+    return int(float(value) * _UNITS[unit.upper()])
+
+
+def format_size(size: int) -> str:
+    return f"{size / (1 << 20):.0f} MiB"
+
+
+def current_rss() -> int:
+    """Resident memory of this process in bytes, or 0 where unknown."""
+    try:
+        with open("/proc/self/statm") as handle:
+            pages = int(handle.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * resource.getpagesize()
+
+
+def reset_peak_rss() -> bool:
+    """Restart peak RSS tracking, where the OS allows it (Linux only)."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss() -> int:
+    """Peak resident memory in bytes since start or the last reset_peak_rss."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
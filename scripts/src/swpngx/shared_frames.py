@@ -0,0 +1,43 @@
+"""Share decoded bezel bitmaps between framing worker processes.
+
+The parent decodes every bezel PNG once and writes the raw RGBA pixels to a
+file. Workers memory-map that file read-only and wrap it with
+``Image.frombuffer``, so all processes share the same page-cache pages instead
+of each holding a private decoded copy.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    path: Path
+    size: tuple[int, int]
+
+
+def export_frames(frames: dict[str, Path], directory: Path) -> dict[str, SharedFrame]:
+    """Decode bezel PNGs (keyed by device name) into raw RGBA files."""
+    shared: dict[str, SharedFrame] = {}
+    for index, (name, frame_path) in enumerate(sorted(frames.items())):
+        if not frame_path.is_file():
+            raise FileNotFoundError(f"Frame image not found: {frame_path}")
+        image = Image.open(frame_path).convert("RGBA")
+        slug = re.sub(r"[^A-Za-z0-9_-]", "_", name)
+        raw_path = directory / f"{index:02d}_{slug}.rgba"
+        raw_path.write_bytes(image.tobytes())
+        shared[name] = SharedFrame(path=raw_path, size=image.size)
+    return shared
+
+
+def attach_frame(shared: SharedFrame) -> Image.Image:
+    """Map an exported bezel without copying it; the image is read-only."""
+    with shared.path.open("rb") as handle:
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return Image.frombuffer("RGBA", shared.size, buffer, "raw", "RGBA", 0, 1)
@@ -10,7 +10,8 @@ class StringUnit(pydantic.BaseModel):
 
 
 class LocalizationItem(pydantic.BaseModel):
-    string_unit: StringUnit | None = pydantic.Field(alias="stringUnit")
+    # Unset for strings with plural or device variations
+    string_unit: StringUnit | None = pydantic.Field(default=None, alias="stringUnit")
 
 
 class StringCatalogString(pydantic.BaseModel):
@@ -0,0 +1,564 @@
+"""Benchmarks of title wrapping over the string catalogs.
+
+``bench-text`` wraps the screenshot titles as the frames use them:
+
+Each translation of each title is wrapped for every device, at the text size
+and width ``frames.toml`` gives its screen, once per wrap strategy. Screens are
+matched with their ``screen_pattern`` as the screenshot name, which holds for
+the literal patterns the config uses. Times are per title with fonts, glyph
+metrics and hyphenation dictionaries loaded, as in a real run after the first
+frame; the first pass over all titles is reported separately. Titles whose
+style sets ``text_fit`` are also fitted, starting without cached fonts.
+
+``bench-layout`` wraps every string of the screenshot catalog, and the long
+strings of the app's catalogs as a stress corpus, at a grid of sizes and
+widths. It counts FreeType measurements and records a digest of every layout,
+and compares both and the times with a checked-in baseline, so changes to
+wrapping or measuring show both slowdowns and moved line breaks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated
+
+import PIL
+import typer
+from PIL import ImageFont
+from pydantic import BaseModel, Field
+from rich.console import Console
+from rich.table import Table
+
+from swpngx import frame as framing
+from swpngx.fonts import ensure_framing_font
+from swpngx.frame_manifest import file_digest
+from swpngx.string_catalog import load as load_string_catalog
+from swpngx.text_wrap import (
+    TextWrapConfig,
+    WrappedLine,
+    WrapStrategy,
+    clear_font_caches,
+    get_pyphen_dict,
+    layout_engines,
+    load_font,
+    wrap_text_pixel,
+)
+
+console = Console()
+
+LAYOUT_BENCH_VERSION = 1
+DEFAULT_LAYOUT_BASELINE = Path("scripts/benchmarks/text_layout_baseline.json")
+DEFAULT_LAYOUT_OUTPUT = Path("scripts/benchmarks/text_layout_results.json")
+DEFAULT_STRESS_CATALOGS = Path("AppShared/Sources/AppShared/Resources/Localization")
+LAYOUT_SIZES = [60, 100]
+LAYOUT_WIDTHS = [600, 1200]
+# Strings whose new line breaks are printed when they changed
+LAYOUT_CHANGES_SHOWN = 20
+
+
+@dataclass(frozen=True)
+class TitleCase:
+    key: str
+    locale: str
+    device: str
+    text: str
+    size: int
+    max_width: int
+    hyphenate: bool
+    strategy: WrapStrategy
+    fit: framing.TextFit | None
+
+
+def title_cases(config_file: Path) -> list[TitleCase]:
+    config = framing.load_config(config_file)
+    catalog_file = config_file.parent / config.string_catalog
+    titles = load_string_catalog(catalog_file.read_text()).as_dict()
+    cases: list[TitleCase] = []
+    for screen in config.screens:
+        if not screen.title_key:
+            continue
+        for device in config.devices:
+            _, style = config.load_screen_config(
+                device.name, Path(f"{device.name}-{screen.screen_pattern}.png")
+            )
+            for locale, text in titles.get(screen.title_key, {}).items():
+                cases.append(
+                    TitleCase(
+                        key=screen.title_key,
+                        locale=locale,
+                        device=device.name,
+                        text=text,
+                        size=style.text_size,
+                        max_width=framing.title_max_width(device, style),
+                        hyphenate=style.text_hyphenate,
+                        strategy=style.text_wrap,
+                        fit=style.text_fit,
+                    )
+                )
+    return cases
+
+
+def wrap_case(
+    case: TitleCase, font_file: Path, strategy: WrapStrategy
+) -> list[WrappedLine]:
+    config = TextWrapConfig(
+        max_width=case.max_width, hyphenate=case.hyphenate, strategy=strategy
+    )
+    font = load_font(font_file, case.size, "Bold")
+    return wrap_text_pixel(case.text, font, config, locale=case.locale)
+
+
+def fit_case(case: TitleCase, font_file: Path) -> int:
+    config = TextWrapConfig(
+        max_width=case.max_width, hyphenate=case.hyphenate, strategy=case.strategy
+    )
+    style = framing.ScreenStyle(text_size=case.size, text_fit=case.fit)
+    return framing.title_text_size(case.text, case.locale, font_file, style, config)
+
+
+def raggedness(lines: list[WrappedLine], max_width: int) -> float:
+    """Difference between the longest and shortest line, relative to the width."""
+    widths = [line.width for line in lines]
+    return (max(widths) - min(widths)) / max_width
+
+
+def main(
+    config_file: Annotated[
+        Path, typer.Option("--config", exists=True, dir_okay=False)
+    ] = Path("frames.toml"),
+    repeat: Annotated[
+        int, typer.Option("--repeat", min=1, help="Timed wraps per title")
+    ] = 5,
+    show_changes: Annotated[
+        bool,
+        typer.Option(
+            "--show-changes", help="Print titles the strategies wrap differently"
+        ),
+    ] = False,
+):
+    config_file = config_file.resolve()
+    font_file = ensure_framing_font(config_file)
+    cases = title_cases(config_file)
+    if not cases:
+        console.log("[yellow]No titles found in the string catalog")
+        raise typer.Exit(1)
+    console.log(
+        f"Wrapping {len(cases)} titles "
+        f"({len({(case.key, case.locale) for case in cases})} translations)"
+    )
+
+    table = Table(title="Title wrapping (ms per title)")
+    table.add_column("strategy")
+    table.add_column("first pass", justify="right")
+    table.add_column("median", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("max", justify="right")
+    table.add_column("lines", justify="right")
+    table.add_column("hyphens", justify="right")
+    table.add_column("raggedness", justify="right")
+
+    layouts: dict[WrapStrategy, list[list[WrappedLine]]] = {}
+    for strategy in WrapStrategy:
+        clear_font_caches()
+        start = time.perf_counter()
+        layouts[strategy] = [wrap_case(case, font_file, strategy) for case in cases]
+        first_pass = time.perf_counter() - start
+
+        samples = []
+        for case in cases:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                wrap_case(case, font_file, strategy)
+            samples.append((time.perf_counter() - start) / repeat * 1000)
+        samples.sort()
+
+        lines = layouts[strategy]
+        multiline = [
+            raggedness(layout, case.max_width)
+            for layout, case in zip(lines, cases)
+            if len(layout) > 1
+        ]
+        table.add_row(
+            strategy.value,
+            f"{first_pass / len(cases) * 1000:.2f}",
+            f"{statistics.median(samples):.2f}",
+            f"{samples[int(0.95 * (len(samples) - 1))]:.2f}",
+            f"{samples[-1]:.2f}",
+            str(sum(len(layout) for layout in lines)),
+            str(sum(line.ends_with_hyphen for layout in lines for line in layout)),
+            f"{statistics.mean(multiline):.0%}" if multiline else "-",
+        )
+    console.print(table)
+
+    greedy, optimal = layouts[WrapStrategy.greedy], layouts[WrapStrategy.optimal]
+    changed = [
+        (case, before, after)
+        for case, before, after in zip(cases, greedy, optimal)
+        if [line.text for line in before] != [line.text for line in after]
+    ]
+    console.log(f"{len(changed)} of {len(cases)} titles wrap differently")
+
+    fitted = [case for case in cases if case.fit is not None]
+    if fitted:
+        clear_font_caches()
+        start = time.perf_counter()
+        sizes = [fit_case(case, font_file) for case in fitted]
+        elapsed = time.perf_counter() - start
+        shrunk = sum(
+            size < (case.fit.max_size or case.size) for size, case in zip(sizes, fitted)
+        )
+        console.log(
+            f"Fitted {len(fitted)} titles in {elapsed * 1000:.0f} ms, "
+            f"sizes {min(sizes)} to {max(sizes)}, {shrunk} shrunk"
+        )
+    if show_changes:
+        for case, before, after in changed:
+            console.print(f"[bold]{case.key}[/bold] {case.locale} {case.device}")
+            console.print(f"  greedy:  {' | '.join(line.text for line in before)}")
+            console.print(f"  optimal: {' | '.join(line.text for line in after)}")
+
+
+@dataclass(frozen=True)
+class CorpusText:
+    corpus: str
+    # Catalog file stem, string key and locale
+    name: str
+    locale: str
+    text: str
+
+
+class CountingFont(ImageFont.FreeTypeFont):
+    """A font that counts its getlength calls, the measurements wrapping makes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    def getlength(self, text, *args, **kwargs):
+        self.calls += 1
+        return super().getlength(text, *args, **kwargs)
+
+
+class LayoutResult(BaseModel):
+    strings: int
+    layouts: int
+    # Milliseconds for wrapping the corpus at every size and width, with new
+    # fonts, and the median with their glyph metrics cached
+    cold: float
+    warm: float
+    getlength: int
+    lines: int
+    hyphens: int
+
+
+class LayoutBenchResults(BaseModel):
+    version: int = LAYOUT_BENCH_VERSION
+    sizes: list[int]
+    widths: list[int]
+    repeat: int
+    environment: dict[str, str] = Field(default_factory=dict)
+    # By corpus and strategy, e.g. "stress/optimal"
+    results: dict[str, LayoutResult] = Field(default_factory=dict)
+    # Digest of the lines of each string, per strategy, size and width in
+    # that order
+    layouts: dict[str, list[str]] = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "LayoutBenchResults":
+        return cls.model_validate_json(path.read_text(encoding="utf-8"))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.model_dump_json(indent=2) + "\n", encoding="utf-8")
+
+
+def catalog_texts(
+    corpus: str, catalog_file: Path, min_length: int = 0
+) -> list[CorpusText]:
+    catalog = load_string_catalog(catalog_file.read_text()).as_dict()
+    return [
+        CorpusText(corpus, f"{catalog_file.stem}/{key}/{locale}", locale, text)
+        for key, translations in sorted(catalog.items())
+        for locale, text in sorted(translations.items())
+        if len(text) >= min_length
+    ]
+
+
+def counting_font(font_file: Path, size: int) -> CountingFont:
+    font = CountingFont(str(font_file), size)
+    try:
+        font.set_variation_by_name("Bold")
+    except (AttributeError, OSError, ValueError):
+        pass
+    return font
+
+
+def layout_digest(lines: list[WrappedLine]) -> str:
+    text = "\n".join(line.text for line in lines)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def bench_layouts(
+    texts: list[CorpusText],
+    font_file: Path,
+    strategy: WrapStrategy,
+    sizes: list[int],
+    widths: list[int],
+    repeat: int,
+) -> tuple[LayoutResult, dict[str, list[WrappedLine]]]:
+    fonts = {size: counting_font(font_file, size) for size in sizes}
+    configs = [
+        (fonts[size], TextWrapConfig(max_width=width, strategy=strategy))
+        for size in sizes
+        for width in widths
+    ]
+
+    def wrap_all() -> list[list[WrappedLine]]:
+        return [
+            wrap_text_pixel(text.text, font, config, locale=text.locale)
+            for font, config in configs
+            for text in texts
+        ]
+
+    start = time.perf_counter()
+    layouts = wrap_all()
+    cold = time.perf_counter() - start
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        wrap_all()
+        samples.append(time.perf_counter() - start)
+
+    by_text: dict[str, list[WrappedLine]] = {}
+    for index, lines in enumerate(layouts):
+        by_text.setdefault(texts[index % len(texts)].name, []).append(lines)
+    result = LayoutResult(
+        strings=len(texts),
+        layouts=len(layouts),
+        cold=round(cold * 1000, 2),
+        warm=round(statistics.median(samples) * 1000, 2),
+        getlength=sum(font.calls for font in fonts.values()),
+        lines=sum(len(lines) for lines in layouts),
+        hyphens=sum(line.ends_with_hyphen for lines in layouts for line in lines),
+    )
+    return result, by_text
+
+
+def compare_layout_results(
+    results: LayoutBenchResults,
+    baseline: LayoutBenchResults,
+    layouts: dict[str, list[list[WrappedLine]]],
+    max_regression: float,
+    min_delta: float,
+    compare_times: bool = False,
+) -> list[str]:
+    """Print a comparison table and moved line breaks, return the regressions.
+
+    ``layouts`` holds the lines of each string in the order of the digests.
+    Times are only checked with ``compare_times``.
+    """
+    table = Table(title="Text layout benchmark")
+    table.add_column("Corpus")
+    table.add_column("Measure")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+
+    # Measurement counts and layouts only repeat with the same font, layout
+    # engine, hyphenation dictionaries and line breaker. Times only repeat on
+    # the same machine, which the environment cannot tell, so they are compared
+    # on request only.
+    same_text = all(
+        baseline.environment.get(name) == results.environment.get(name)
+        for name in ("font", *layout_engines())
+    ) and (baseline.sizes, baseline.widths) == (results.sizes, results.widths)
+    regressions: list[str] = []
+    for name, result in results.results.items():
+        reference = baseline.results.get(name)
+        for measure in ("cold", "warm", "getlength", "lines", "hyphens"):
+            value = getattr(result, measure)
+            if reference is None:
+                table.add_row(name, measure, "-", f"{value:g}", "")
+                continue
+            base_value = getattr(reference, measure)
+            change = (value - base_value) / base_value if base_value else 0.0
+            if measure == "warm":
+                regressed = (
+                    compare_times
+                    and value - base_value > min_delta
+                    and change > max_regression
+                )
+            else:
+                # A single cold pass is too noisy to check
+                regressed = same_text and measure == "getlength" and change > 0
+            style = "red" if regressed else ("green" if change < 0 else "")
+            table.add_row(
+                name,
+                measure,
+                f"{base_value:g}",
+                f"{value:g}",
+                f"[{style}]{change:+.0%}[/{style}]" if style else f"{change:+.0%}",
+            )
+            if regressed:
+                regressions.append(f"{name} {measure}: {base_value:g} -> {value:g}")
+    console.print(table)
+
+    if not same_text:
+        console.log(
+            "[yellow]Baseline was taken with a different font, layout engine, "
+            "Pyphen, line breaker or grid; not checking measurement counts and "
+            "line breaks"
+        )
+        return regressions
+    grid = [
+        f"{strategy.value} {size}px in {width}px"
+        for strategy in WrapStrategy
+        for size in results.sizes
+        for width in results.widths
+    ]
+    changed = 0
+    for name, digests in sorted(results.layouts.items()):
+        before = baseline.layouts.get(name)
+        if before is None or before == digests:
+            continue
+        changed += 1
+        if changed > LAYOUT_CHANGES_SHOWN:
+            continue
+        console.print(f"[bold]{name}[/bold] now wraps as")
+        for case, lines, old, new in zip(grid, layouts[name], before, digests):
+            if old != new:
+                console.print(f"  {case}: " + " | ".join(line.text for line in lines))
+    if changed > LAYOUT_CHANGES_SHOWN:
+        console.print(f"... and {changed - LAYOUT_CHANGES_SHOWN} more")
+    if changed:
+        regressions.append(f"line breaks of {changed} string(s) changed")
+    return regressions
+
+
+def layout_main(
+    config_file: Annotated[
+        Path, typer.Option("--config", exists=True, dir_okay=False)
+    ] = Path("frames.toml"),
+    stress_catalogs: Annotated[
+        Path,
+        typer.Option(
+            "--stress-catalogs",
+            file_okay=False,
+            help="Folder of string catalogs whose long strings are the stress corpus",
+        ),
+    ] = DEFAULT_STRESS_CATALOGS,
+    min_length: Annotated[
+        int,
+        typer.Option(
+            "--min-length", min=1, help="Shortest string in the stress corpus"
+        ),
+    ] = 120,
+    repeat: Annotated[
+        int, typer.Option("--repeat", min=1, help="Timed passes with warm fonts")
+    ] = 3,
+    output: Annotated[
+        Path, typer.Option("--output", help="Where to write the results JSON")
+    ] = DEFAULT_LAYOUT_OUTPUT,
+    baseline_file: Annotated[
+        Path, typer.Option("--baseline", help="Baseline results to compare against")
+    ] = DEFAULT_LAYOUT_BASELINE,
+    update_baseline: Annotated[
+        bool,
+        typer.Option("--update-baseline", help="Write this run as the new baseline"),
+    ] = False,
+    compare_times: Annotated[
+        bool,
+        typer.Option(
+            "--compare-times",
+            help="Also fail if wrapping got slower; only with a baseline taken on "
+            "this machine",
+        ),
+    ] = False,
+    max_regression: Annotated[
+        float,
+        typer.Option(
+            "--max-regression",
+            min=0,
+            help="With --compare-times, fail if wrapping gets slower than this "
+            "fraction (0.25 = 25%)",
+        ),
+    ] = 0.25,
+    min_delta: Annotated[
+        float,
+        typer.Option(
+            "--min-delta",
+            min=0,
+            help="Ignore slowdowns smaller than this many milliseconds",
+        ),
+    ] = 5.0,
+):
+    config_file = config_file.resolve()
+    config = framing.load_config(config_file)
+    font_file = ensure_framing_font(config_file)
+    texts = catalog_texts("screenshots", config_file.parent / config.string_catalog)
+    stress_dir = config_file.parent / stress_catalogs
+    for catalog_file in sorted(stress_dir.glob("*.xcstrings")):
+        texts += catalog_texts("stress", catalog_file, min_length)
+    corpora = {
+        corpus: [text for text in texts if text.corpus == corpus]
+        for corpus in ("screenshots", "stress")
+    }
+    console.log(
+        ", ".join(f"{len(items)} {corpus} strings" for corpus, items in corpora.items())
+    )
+
+    # Dictionaries load once per process and are not part of wrapping
+    for locale in {text.locale for text in texts}:
+        get_pyphen_dict(locale)
+
+    results = LayoutBenchResults(
+        sizes=LAYOUT_SIZES,
+        widths=LAYOUT_WIDTHS,
+        repeat=repeat,
+        environment={
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            **layout_engines(),
+            "font": file_digest(font_file)[:12],
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+    )
+    current: dict[str, list[list[WrappedLine]]] = {}
+    for corpus, items in corpora.items():
+        if not items:
+            continue
+        for strategy in WrapStrategy:
+            console.log(f"Wrapping {corpus} strings ({strategy.value})")
+            result, layouts = bench_layouts(
+                items, font_file, strategy, LAYOUT_SIZES, LAYOUT_WIDTHS, repeat
+            )
+            results.results[f"{corpus}/{strategy.value}"] = result
+            for name, lines in layouts.items():
+                current.setdefault(name, []).extend(lines)
+                results.layouts.setdefault(name, []).extend(map(layout_digest, lines))
+
+    results.save(output)
+    console.log(f"Wrote {output}")
+
+    if update_baseline:
+        results.save(baseline_file)
+        console.log(f"Updated baseline {baseline_file}")
+        return
+
+    if not baseline_file.is_file():
+        console.log(f"[yellow]No baseline at {baseline_file}, nothing to compare")
+        return
+    baseline = LayoutBenchResults.load(baseline_file)
+    regressions = compare_layout_results(
+        results, baseline, current, max_regression, min_delta, compare_times
+    )
+    if regressions:
+        for regression in regressions:
+            console.log(f"[red]Regression: {regression}")
+        raise typer.Exit(1)
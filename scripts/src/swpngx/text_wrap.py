@@ -1,17 +1,30 @@
 """Pixel-based text wrapping with hyphenation support."""
 
+import bisect
+import functools
+import importlib.metadata
+import math
 import re
+import weakref
+from collections.abc import Sequence
 from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
 from typing import Optional
 
-from PIL import ImageFont
+from PIL import ImageFont, features
+
+from swpngx.line_break import ICU_AVAILABLE, line_break_offsets
+from swpngx.timing import staged
 
 try:
     from pyphen import Pyphen
 
     PYPHEN_AVAILABLE = True
+    PYPHEN_VERSION: str | None = importlib.metadata.version("pyphen")
 except ImportError:
     PYPHEN_AVAILABLE = False
+    PYPHEN_VERSION = None
     Pyphen = None
 
 
@@ -95,6 +108,13 @@ HYPHENATION_UNSUPPORTED = {
 }
 
 
+class WrapStrategy(str, Enum):
+    # Fill each line before starting the next
+    greedy = "greedy"
+    # Fewest lines, then the most even ones; see wrap_text_optimal
+    optimal = "optimal"
+
+
 @dataclass
 class TextWrapConfig:
     """Configuration for text wrapping."""
@@ -104,6 +124,15 @@ class TextWrapConfig:
     hyphen_char: str = "-"
     min_chars_before_hyphen: int = 2
     min_chars_after_hyphen: int = 2
+    strategy: WrapStrategy = WrapStrategy.greedy
+    # Costs for the optimal strategy, relative to a line left completely empty
+    hyphen_penalty: float = 0.3
+    short_last_line_penalty: float = 0.5
+
+
+# Cost of every line in wrap_text_optimal, so that saving a line always beats
+# any amount of raggedness
+LINE_COST = 100.0
 
 
 @dataclass
@@ -115,15 +144,183 @@ class WrappedLine:
     ends_with_hyphen: bool = False
 
 
+class GlyphMetrics:
+    """Cached text widths of one font.
+
+    With Pillow's basic layout a string's width is the sum of its characters'
+    advances plus a kerning correction for each adjacent pair, so each
+    character and pair is measured with FreeType once. Widths are multiples of
+    1/64 px, so the sums are exact. Raqm layout shapes whole runs (ligatures,
+    Arabic joining), so there only whole strings are cached.
+    """
+
+    def __init__(self, font: ImageFont.FreeTypeFont):
+        self.font = font
+        self.additive = font.layout_engine == ImageFont.Layout.BASIC
+        self.advances: dict[str, float] = {}
+        self.kerning: dict[str, float] = {}
+        self.lengths: dict[str, float] = {}
+
+    def advance(self, char: str) -> float:
+        width = self.advances.get(char)
+        if width is None:
+            width = self.advances[char] = self.font.getlength(char)
+        return width
+
+    def correction(self, pair: str) -> float:
+        """Kerning between the two characters of ``pair`` (basic layout only)."""
+        correction = self.kerning.get(pair)
+        if correction is None:
+            correction = self.kerning[pair] = (
+                self.font.getlength(pair)
+                - self.advance(pair[0])
+                - self.advance(pair[1])
+            )
+        return correction
+
+    def length(self, text: str) -> float:
+        width = self.lengths.get(text)
+        if width is not None:
+            return width
+        if not self.additive:
+            width = self.font.getlength(text)
+        else:
+            advance, correction = self.advance, self.correction
+            width = advance(text[0])
+            for pair in map(str.__add__, text, text[1:]):
+                width += advance(pair[1]) + correction(pair)
+        self.lengths[text] = width
+        return width
+
+
+class PrefixWidths:
+    """Widths of the prefixes of one word, for finding where to break it.
+
+    With basic layout the whole table comes from one pass over the word's
+    advances and kerning pairs, and a trailing hyphen is added the same way.
+    Raqm shapes every candidate separately, so those are measured on demand;
+    the binary search in ``longest_fitting`` needs only a few.
+    """
+
+    def __init__(self, metrics: GlyphMetrics, text: str):
+        self.metrics = metrics
+        self.text = text
+        self.widths: list[float] = []
+        if metrics.additive and text:
+            advance, correction = metrics.advance, metrics.correction
+            width = advance(text[0])
+            self.widths = [0.0, width]
+            for pair in map(str.__add__, text, text[1:]):
+                width += advance(pair[1]) + correction(pair)
+                self.widths.append(width)
+
+    def width(self, end: int, suffix: str = "") -> float:
+        """Width of ``text[:end] + suffix``."""
+        if not self.widths:
+            return measure_text(self.metrics.font, self.text[:end] + suffix)
+        width = self.widths[end]
+        if suffix:
+            width += self.metrics.length(suffix)
+            if end:
+                width += self.metrics.correction(self.text[end - 1] + suffix[0])
+        return width
+
+    def span(self, start: int, end: int) -> float:
+        """Width of ``text[start:end]``, without kerning against the character before."""
+        if not start:
+            return self.width(end)
+        if not self.widths:
+            return measure_text(self.metrics.font, self.text[start:end])
+        return (
+            self.widths[end]
+            - self.widths[start]
+            - self.metrics.correction(self.text[start - 1 : start + 1])
+        )
+
+    def longest_fitting(
+        self, ends: Sequence[int], max_width: float, suffix: str = ""
+    ) -> int:
+        """Largest of the ascending ``ends`` whose prefix and suffix fit, or 0.
+
+        Prefix widths only grow, as every character advances further than a
+        kerning pair can pull it back.
+        """
+        fitting = bisect.bisect_right(
+            ends, max_width, key=lambda end: self.width(end, suffix)
+        )
+        return ends[fitting - 1] if fitting else 0
+
+
+_METRICS: "weakref.WeakKeyDictionary[ImageFont.FreeTypeFont, GlyphMetrics]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Large enough for the sizes fit_text_size probes across all titles
+@functools.lru_cache(maxsize=64)
+def load_font(
+    path: Path, size: int, variation: str | None = None
+) -> ImageFont.FreeTypeFont:
+    """Per-process cache of fonts, so their glyph metrics are kept as well.
+
+    Fonts without the named ``variation`` are returned in their default style.
+    """
+    font = ImageFont.truetype(str(path), size)
+    if variation is not None:
+        try:
+            font.set_variation_by_name(variation)
+        except (AttributeError, OSError, ValueError):
+            pass
+    return font
+
+
+def clear_font_caches() -> None:
+    """Forget loaded fonts and measured widths, e.g. after a font file changed."""
+    load_font.cache_clear()
+    _METRICS.clear()
+
+
+def glyph_metrics(font: ImageFont.FreeTypeFont) -> GlyphMetrics:
+    metrics = _METRICS.get(font)
+    if metrics is None:
+        metrics = _METRICS[font] = GlyphMetrics(font)
+    return metrics
+
+
 def measure_text(font: ImageFont.FreeTypeFont, text: str) -> float:
     """Measure the width of text in pixels."""
     if not text:
         return 0.0
-    return font.getlength(text)
+    return glyph_metrics(font).length(text)
+
 
+def prefix_widths(font: ImageFont.FreeTypeFont, text: str) -> PrefixWidths:
+    return PrefixWidths(glyph_metrics(font), text)
 
+
+@functools.cache
+def layout_engines() -> dict[str, str | None]:
+    """Libraries that change how a title is laid out, for cache keys.
+
+    The same title, font and width can wrap differently under another text
+    layout engine, hyphenation dictionaries or line breaker (ICU finds Thai and
+    Lao words, the fallback breaks between clusters), so layouts and outputs
+    made with one set are not reused with another.
+    """
+    return {
+        "layout": "raqm" if features.check("raqm") else "basic",
+        "pyphen": PYPHEN_VERSION,
+        "line_break": "icu" if ICU_AVAILABLE else "fallback",
+    }
+
+
+@functools.cache
 def get_pyphen_dict(locale: str) -> Optional["Pyphen"]:
-    """Get pyphen dictionary for locale, or None if unavailable."""
+    """Get pyphen dictionary for locale, or None if unavailable.
+
+    Dictionaries are kept for the life of the process, so each locale's
+    patterns are looked up and loaded once.
+    """
     if not PYPHEN_AVAILABLE:
         return None
 
@@ -178,28 +375,195 @@ def find_hyphenation_point(
         space_for_word -= measure_text(font, " ")
 
     # pyphen.iterate() yields pairs from longest first part to shortest
-    for first, second in pyphen_dict.iterate(word):
+    splits = [
+        (first, second)
+        for first, second in pyphen_dict.iterate(word)
         # Ensure minimum characters on each side
-        if len(first) < config.min_chars_before_hyphen:
-            continue
-        if len(second) < config.min_chars_after_hyphen:
-            continue
+        if len(first) >= config.min_chars_before_hyphen
+        and len(second) >= config.min_chars_after_hyphen
+    ]
+    if not splits:
+        return None
 
-        first_with_hyphen = first + config.hyphen_char
-        width = measure_text(font, first_with_hyphen)
+    prefixes = prefix_widths(font, word)
+    if all(first + second == word for first, second in splits):
+        ends = [len(first) for first, _ in reversed(splits)]
+        end = prefixes.longest_fitting(ends, space_for_word, config.hyphen_char)
+        if not end:
+            return None
+        return (word[:end] + config.hyphen_char, word[end:])
 
+    # Some dictionaries respell around the break (Hungarian "ssz" becomes
+    # "sz-sz"), so their parts are not all prefixes; try them in order
+    for first, second in splits:
+        if first + second == word:
+            width = prefixes.width(len(first), config.hyphen_char)
+        else:
+            width = measure_text(font, first + config.hyphen_char)
         if width <= space_for_word:
-            return (first_with_hyphen, second)
+            return (first + config.hyphen_char, second)
 
     return None
 
 
+def hyphenation_offsets(
+    word: str, pyphen_dict: Optional["Pyphen"], config: TextWrapConfig
+) -> list[int]:
+    """Ascending offsets where ``word`` may be hyphenated as written.
+
+    Splits that respell the word around the break are left to the greedy
+    strategy, see find_hyphenation_point.
+    """
+    if pyphen_dict is None:
+        return []
+    return sorted(
+        len(first)
+        for first, second in pyphen_dict.iterate(word)
+        if first + second == word
+        and len(first) >= config.min_chars_before_hyphen
+        and len(second) >= config.min_chars_after_hyphen
+    )
+
+
+def split_at_line_breaks(
+    word: str,
+    offsets: list[int],
+    font: ImageFont.FreeTypeFont,
+    available_width: float,
+    max_width: float,
+) -> list[str]:
+    """Split ``word`` at its line break ``offsets`` into one piece per line.
+
+    The first piece fills the ``available_width`` left on the current line and
+    is empty if nothing fits there; every other piece starts a new line. All
+    pieces are measured from one prefix table of the word, so measuring is
+    linear in its length. A piece between two breaks that is wider than a
+    whole line is kept whole.
+    """
+    prefixes = prefix_widths(font, word)
+    pieces: list[str] = []
+    start = 0
+    # Index of the first offset after start
+    index = 0
+    while True:
+        if index == len(offsets) or prefixes.span(start, len(word)) <= available_width:
+            pieces.append(word[start:])
+            return pieces
+        fitting = bisect.bisect_right(
+            offsets,
+            available_width,
+            lo=index,
+            key=lambda end: prefixes.span(start, end),
+        )
+        if fitting == index and available_width >= max_width:
+            fitting += 1
+        end = offsets[fitting - 1] if fitting > index else start
+        pieces.append(word[start:end])
+        start, index = end, fitting
+        available_width = max_width
+
+
+def wrap_text_optimal(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    config: TextWrapConfig,
+    pyphen_dict: Optional["Pyphen"],
+    locale: str = "en",
+) -> list[WrappedLine] | None:
+    """Wrap normalized ``text`` by dynamic programming over all break candidates.
+
+    Lines may break at spaces, at the line break opportunities of scripts
+    written without spaces and at hyphenation points. Each line costs
+    LINE_COST plus its squared slack as a fraction of ``max_width``, so the
+    fewest lines win and among those the most even. Hyphenating adds
+    ``hyphen_penalty``. The last line has no slack cost, but one shorter than
+    half the width adds up to ``short_last_line_penalty``. Returns None if a
+    word cannot fit even when hyphenated, which needs the greedy force-break.
+    """
+    words = text.split()
+    max_width = config.max_width
+    # (word, offset): offset len(word) breaks at the space after the word
+    breaks = [(0, 0)]
+    # Breaks inside a word that add a hyphen
+    hyphens: set[tuple[int, int]] = set()
+    for index, word in enumerate(words):
+        offsets = line_break_offsets(word, locale)
+        if not offsets:
+            offsets = hyphenation_offsets(word, pyphen_dict, config)
+            hyphens.update((index, offset) for offset in offsets)
+        breaks += [(index, offset) for offset in offsets]
+        breaks.append((index, len(word)))
+    last = len(breaks) - 1
+
+    def line_text(start: int, end: int) -> str:
+        (first, offset), (final, end_offset) = breaks[start], breaks[end]
+        if offset == len(words[first]):
+            first, offset = first + 1, 0
+        if first == final:
+            line = words[first][offset:end_offset]
+        else:
+            line = " ".join(
+                [
+                    words[first][offset:],
+                    *words[first + 1 : final],
+                    words[final][:end_offset],
+                ]
+            )
+        if (final, end_offset) in hyphens:
+            line += config.hyphen_char
+        return line
+
+    best = [math.inf] * len(breaks)
+    best[0] = 0.0
+    previous = [0] * len(breaks)
+    for start in range(last):
+        if best[start] == math.inf:
+            continue
+        for end in range(start + 1, len(breaks)):
+            hyphenated = breaks[end] in hyphens
+            width = measure_text(font, line_text(start, end))
+            if width > max_width:
+                if hyphenated:
+                    continue
+                # Every later candidate contains this whole line
+                break
+            if end == last:
+                short = max(0.0, 1.0 - 2.0 * width / max_width)
+                cost = config.short_last_line_penalty * short**2
+            else:
+                cost = ((max_width - width) / max_width) ** 2
+            cost += LINE_COST
+            if hyphenated:
+                cost += config.hyphen_penalty
+            if best[start] + cost < best[end]:
+                best[end] = best[start] + cost
+                previous[end] = start
+
+    if best[last] == math.inf:
+        return None
+    ends = [last]
+    while ends[-1]:
+        ends.append(previous[ends[-1]])
+    lines = []
+    for start, end in zip(reversed(ends[1:]), reversed(ends[:-1])):
+        line = line_text(start, end)
+        lines.append(
+            WrappedLine(
+                text=line,
+                width=measure_text(font, line),
+                ends_with_hyphen=breaks[end] in hyphens,
+            )
+        )
+    return lines
+
+
 def normalize_whitespace(text: str) -> str:
     """Normalize whitespace: replace newlines with spaces, collapse multiple spaces."""
     # Replace all whitespace (including newlines) with single spaces
     return re.sub(r"\s+", " ", text).strip()
 
 
+@staged("wrap_text_pixel")
 def wrap_text_pixel(
     text: str,
     font: ImageFont.FreeTypeFont,
@@ -229,6 +593,11 @@ def wrap_text_pixel(
     # Get hyphenation dictionary if enabled
     pyphen_dict = get_pyphen_dict(locale) if config.hyphenate else None
 
+    if config.strategy == WrapStrategy.optimal:
+        lines = wrap_text_optimal(text, font, config, pyphen_dict, locale)
+        if lines is not None:
+            return lines
+
     words = text.split()
     lines: list[WrappedLine] = []
     current_line_words: list[str] = []
@@ -249,6 +618,29 @@ def wrap_text_pixel(
             # Word fits on current line
             current_line_words.append(word)
             current_line_width = test_width
+        elif offsets := line_break_offsets(word, locale):
+            # Scripts written without spaces break between words or
+            # characters, without a hyphen
+            available_width = config.max_width - current_line_width
+            if current_line_words:
+                available_width -= space_width
+            first, *rest = split_at_line_breaks(
+                word, offsets, font, available_width, config.max_width
+            )
+            if first:
+                current_line_words.append(first)
+            for piece in rest:
+                if current_line_words:
+                    line_text = " ".join(current_line_words)
+                    lines.append(
+                        WrappedLine(
+                            text=line_text,
+                            width=measure_text(font, line_text),
+                            ends_with_hyphen=False,
+                        )
+                    )
+                current_line_words = [piece]
+            current_line_width = measure_text(font, " ".join(current_line_words))
         else:
             # Word doesn't fit - try hyphenation
             hyphen_result = None
@@ -288,35 +680,35 @@ def wrap_text_pixel(
                             ends_with_hyphen=False,
                         )
                     )
+                current_line_words = []
+                current_line_width = 0.0
 
                 # Check if word alone is too wide
                 if word_width > config.max_width:
                     # Force-break the word (character by character as last resort)
                     remaining_word = word
                     while remaining_word:
-                        # Find how many characters fit
-                        for i in range(len(remaining_word), 0, -1):
-                            part = remaining_word[:i]
-                            if i < len(remaining_word):
-                                part_with_hyphen = part + config.hyphen_char
-                            else:
-                                part_with_hyphen = part
-                            if measure_text(font, part_with_hyphen) <= config.max_width:
-                                if i < len(remaining_word):
-                                    lines.append(
-                                        WrappedLine(
-                                            text=part_with_hyphen,
-                                            width=measure_text(font, part_with_hyphen),
-                                            ends_with_hyphen=True,
-                                        )
-                                    )
-                                    remaining_word = remaining_word[i:]
-                                else:
-                                    # Last piece - don't add to lines yet, add to current
-                                    current_line_words = [part]
-                                    current_line_width = measure_text(font, part)
-                                    remaining_word = ""
-                                break
+                        prefixes = prefix_widths(font, remaining_word)
+                        length = len(remaining_word)
+                        if prefixes.width(length) <= config.max_width:
+                            # Last piece - don't add to lines yet, add to current
+                            current_line_words = [remaining_word]
+                            current_line_width = prefixes.width(length)
+                            remaining_word = ""
+                            break
+                        # Find how many characters fit with a hyphen
+                        i = prefixes.longest_fitting(
+                            range(1, length), config.max_width, config.hyphen_char
+                        )
+                        if i:
+                            lines.append(
+                                WrappedLine(
+                                    text=remaining_word[:i] + config.hyphen_char,
+                                    width=prefixes.width(i, config.hyphen_char),
+                                    ends_with_hyphen=True,
+                                )
+                            )
+                            remaining_word = remaining_word[i:]
                         else:
                             # Even a single character doesn't fit - force it
                             lines.append(
@@ -345,6 +737,46 @@ def wrap_text_pixel(
     return lines
 
 
+def fit_text_size(
+    text: str,
+    font_file: Path,
+    config: TextWrapConfig,
+    max_lines: int,
+    min_size: int,
+    max_size: int,
+    locale: str = "en",
+    variation: str | None = None,
+) -> int:
+    """Largest size in ``[min_size, max_size]`` at which ``text`` fits.
+
+    Text fits if it wraps to at most ``max_lines`` lines, none of them wider
+    than ``config.max_width``. Smaller text does not need more lines, so the
+    sizes are binary searched. Fonts and their glyph metrics stay cached
+    between probes. Returns ``min_size`` if no size fits. A ``min_size``
+    above ``max_size`` is lowered to it, so the result never exceeds
+    ``max_size``.
+    """
+    min_size = min(min_size, max_size)
+
+    def fits(size: int) -> bool:
+        font = load_font(font_file, size, variation)
+        lines = wrap_text_pixel(text, font, config, locale=locale)
+        return len(lines) <= max_lines and all(
+            line.width <= config.max_width for line in lines
+        )
+
+    if fits(max_size):
+        return max_size
+    low, high = min_size, max_size - 1
+    while low < high:
+        size = (low + high + 1) // 2
+        if fits(size):
+            low = size
+        else:
+            high = size - 1
+    return low
+
+
 def calculate_text_max_width(
     image_width: int,
     text_offset_x: int,
@@ -0,0 +1,147 @@
+"""Stage timing and tracing hooks for the framing pipeline.
+
+Pipeline code wraps each step in ``with stage("name"):`` (or decorates a
+function with ``@staged("name")``). Nothing is measured unless a recorder is
+installed with ``record_stages``, so with timing off a stage costs one global
+lookup.
+
+Recorders receive the stage name and its ``time.perf_counter`` start and end.
+``perf_counter`` is a system-wide monotonic clock, so spans recorded in worker
+processes line up with the parent's when merged into one trace.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TypeVar
+
+StageRecorder = Callable[[str, float, float], None]
+
+_RECORDER: StageRecorder | None = None
+# Tags attached to trace spans, such as the device and locale being framed.
+# A context variable, so pipeline threads framing different files don't mix.
+_TAGS: ContextVar[dict[str, str]] = ContextVar("swpngx_trace_tags", default={})
+
+F = TypeVar("F", bound=Callable)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    recorder = _RECORDER
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder(name, start, time.perf_counter())
+
+
+def staged(name: str) -> Callable[[F], F]:
+    """Decorator form of ``stage``."""
+
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _RECORDER is None:
+                return function(*args, **kwargs)
+            with stage(name):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@contextmanager
+def tagged(**tags: str) -> Iterator[None]:
+    """Attach ``tags`` to the spans recorded within the block."""
+    if _RECORDER is None:
+        yield
+        return
+    token = _TAGS.set({**_TAGS.get(), **tags})
+    try:
+        yield
+    finally:
+        _TAGS.reset(token)
+
+
+@contextmanager
+def record_stages(recorder: StageRecorder) -> Iterator[StageRecorder]:
+    """Send stage timings to ``recorder`` within the block."""
+    global _RECORDER
+    previous = _RECORDER
+    _RECORDER = recorder
+    try:
+        yield recorder
+    finally:
+        _RECORDER = previous
+
+
+class StageTotals:
+    """Recorder summing the seconds spent in each stage."""
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = defaultdict(float)
+
+    def __call__(self, name: str, start: float, end: float) -> None:
+        self.seconds[name] += end - start
+
+
+class TraceRecorder:
+    """Recorder collecting Chrome trace "complete" events.
+
+    Events are plain dicts so they can be returned from worker processes and
+    merged with ``write_chrome_trace``.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict] = []
+        self._pid = os.getpid()
+
+    def __call__(self, name: str, start: float, end: float) -> None:
+        self.events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": _TAGS.get(),
+            }
+        )
+
+    def take(self) -> list[dict]:
+        """Return the recorded events and start over."""
+        events, self.events = self.events, []
+        return events
+
+
+def write_chrome_trace(
+    path: Path, events: list[dict], process_names: dict[int, str]
+) -> None:
+    """Write events as a Chrome/Perfetto trace, with times relative to the first."""
+    origin = min((event["ts"] for event in events), default=0.0)
+    trace = [
+        {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+        for pid, name in process_names.items()
+    ]
+    trace += [
+        {**event, "ts": round(event["ts"] - origin, 1), "dur": round(event["dur"], 1)}
+        for event in sorted(events, key=lambda event: event["ts"])
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}), encoding="utf-8"
+    )
@@ -0,0 +1,71 @@
+"""Fixtures built from the repo's own frames.toml and screenshot_devices.toml.
+
+Apple's bezel PNGs are not checked in, so every device is also tested with a
+synthetic bezel of the same geometry; tests with the Apple bezels are skipped
+unless they are installed (``swpngx frame install``).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from swpngx import frame as framing
+from swpngx.bench import synthetic_bezel
+from swpngx.fonts import ensure_framing_font
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+FRAMES_CONFIG = REPO_ROOT / "frames.toml"
+
+
+@pytest.fixture(autouse=True)
+def clear_framing_caches() -> Iterator[None]:
+    framing.clear_caches()
+    yield
+    framing.clear_caches()
+
+
+@pytest.fixture
+def frames_config() -> Path:
+    return FRAMES_CONFIG
+
+
+@pytest.fixture
+def config() -> framing.Config:
+    return framing.load_config(FRAMES_CONFIG)
+
+
+@pytest.fixture(scope="session")
+def font_file() -> Path:
+    return ensure_framing_font(FRAMES_CONFIG)
+
+
+@pytest.fixture(params=["synthetic", "apple"])
+def devices(request, config: framing.Config) -> list[framing.DeviceConfig]:
+    """The configured devices, with their bezel images loaded."""
+    for device in config.devices:
+        frame_path = REPO_ROOT / device.frame_path
+        if request.param == "synthetic":
+            device.frame = synthetic_bezel(device)
+        elif frame_path.is_file():
+            device.frame = Image.open(frame_path).convert("RGBA")
+        else:
+            pytest.skip(f"Apple bezel not installed: {frame_path}")
+    return config.devices
+
+
+@pytest.fixture
+def screen_style(config: framing.Config):
+    """Merged config and style of one of the configured screens of a device."""
+
+    def load(
+        device: framing.DeviceConfig, screen: str = "01_documents"
+    ) -> tuple[framing.ScreenConfig, framing.ScreenStyle]:
+        return config.load_screen_config(
+            device.name, Path("de-DE") / f"{device.name}-{screen}.png"
+        )
+
+    return load
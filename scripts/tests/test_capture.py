@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from swpngx import capture
+from swpngx.capture import SettleConfig, wait_for_settle
+
+SETTLE = SettleConfig(stable_probes=3, interval=0.01, min_wait=0)
+
+
+@pytest.fixture
+def screens(monkeypatch):
+    """Replace simulator probes with a list of screen digests, repeating the last."""
+    shown: list[str] = []
+
+    def probe_screen(target: str, path: Path) -> str:
+        return shown.pop(0) if len(shown) > 1 else shown[0]
+
+    monkeypatch.setattr(capture, "probe_screen", probe_screen)
+    return shown
+
+
+def test_settles_on_new_screen(screens, tmp_path):
+    screens += ["old", "moving", "new"]
+
+    result = wait_for_settle("sim", 5, SETTLE, tmp_path / "probe.png")
+
+    assert result.settled
+    assert result.digest == "new"
+    assert result.waited < 5
+
+
+def test_unchanged_screen_waits_in_full_and_keeps_last_probe(screens, tmp_path):
+    screens += ["old"]
+
+    result = wait_for_settle(
+        "sim", 0.1, SETTLE, tmp_path / "probe.png", changed_from="old"
+    )
+
+    assert not result.settled
+    assert result.digest == "old"
+    assert result.waited >= 0.1
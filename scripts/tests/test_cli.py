@@ -0,0 +1,53 @@
+import pytest
+from typer.testing import CliRunner
+
+from swpngx.cli import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def elsewhere(tmp_path, monkeypatch):
+    """A working directory without frames.toml."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_frame_needs_config(elsewhere):
+    result = runner.invoke(app, ["frame"])
+
+    assert result.exit_code == 2
+    assert "does not exist" in result.output
+
+
+def test_frame_merge_uses_its_own_config(elsewhere, frames_config):
+    shard = elsewhere / "shard-1"
+    shard.mkdir()
+
+    result = runner.invoke(
+        app,
+        [
+            "frame",
+            "merge",
+            "--config",
+            str(frames_config),
+            "--output",
+            "out",
+            "shard-1",
+        ],
+    )
+
+    assert "--config" not in result.output
+    assert result.exit_code == 1
+    assert "nothing was merged" in result.output
+
+
+def test_frame_delivered_uses_its_own_config(elsewhere, frames_config):
+    result = runner.invoke(
+        app,
+        ["frame", "delivered", "--config", str(frames_config), "--output", "out"],
+    )
+
+    assert "--config" not in result.output
+    assert result.exit_code == 1
+    assert "No framed screenshots" in result.output
@@ -0,0 +1,82 @@
+import numpy
+import pytest
+
+from swpngx import frame as framing
+from swpngx.bench import synthetic_screenshot
+from swpngx.compositor import Compositor, DeviceLayers
+
+# The NumPy compositor resizes the bezel and the screenshot apart, where the
+# Pillow reference resizes them together. Pixels where the screen or bezel
+# is partly transparent, and their filter support, may differ. Along noisy
+# screen content they differ most, but 95% of them by at most P95_EDGE_DIFFERENCE
+# 8-bit levels. Other pixels only differ by rounding, and in drafts by
+# box-filtering details finer than a pixel on a slightly different grid.
+EDGE_BAND = 2
+MAX_EDGE_DIFFERENCE = 96
+P95_EDGE_DIFFERENCE = 24
+MAX_DIFFERENCE = {framing.Quality.final: 2, framing.Quality.draft: 12}
+# Share of pixels off by more than 2 levels
+MAX_DIFFERING = 0.004
+
+
+def blended_pixels(layers: DeviceLayers) -> numpy.ndarray:
+    """Pixels blended along the screen and bezel edges, grown by EDGE_BAND."""
+    width, height = layers.size
+    edge = numpy.zeros((height, width), dtype=bool)
+    x0, y0, _, _ = layers.screen_clip
+    ys, xs = layers.screen_edge
+    edge[ys + y0, xs + x0] = True
+    edge[layers.bezel.ys, layers.bezel.xs] = True
+    grown = edge.copy()
+    for dy in range(-EDGE_BAND, EDGE_BAND + 1):
+        for dx in range(-EDGE_BAND, EDGE_BAND + 1):
+            grown |= numpy.roll(edge, (dy, dx), axis=(0, 1))
+    return grown
+
+
+def framed(
+    job: framing.FrameJob, font_file, compositor: Compositor, quality
+) -> numpy.ndarray:
+    options = framing.FrameOptions(compositor=compositor, quality=quality)
+    size = tuple(job.device.target_size)
+    if quality is framing.Quality.draft:
+        size = framing.draft_size(job.device.target_size)
+    screenshot = synthetic_screenshot(tuple(job.device.target_size))
+    screenshot = screenshot.convert("RGBA").resize(size, options.resample)
+    image = framing.compose_frame(job, screenshot, font_file, options)
+    return numpy.asarray(image.convert("RGBA"), dtype=numpy.int16)
+
+
+@pytest.mark.parametrize("quality", list(framing.Quality))
+def test_numpy_compositor_matches_pillow(
+    devices, screen_style, font_file, tmp_path, quality
+):
+    framing.console.quiet = True
+    try:
+        for device in devices:
+            screen, style = screen_style(device)
+            job = framing.FrameJob(
+                file=tmp_path / "de-DE" / f"{device.name}-01_documents.png",
+                device=device,
+                screen=screen,
+                style=style,
+                title="Alle Dokumente immer im Blick",
+                locale="de-DE",
+                output_file=tmp_path / "framed.png",
+            )
+            reference = framed(job, font_file, Compositor.pillow, quality)
+            result = framed(job, font_file, Compositor.numpy, quality)
+            (layers,) = framing._LAYERS.values()
+            framing.clear_caches()
+
+            assert result.shape == reference.shape, device.name
+            difference = numpy.abs(result - reference).max(axis=2)
+            edge = blended_pixels(layers)
+            assert difference[~edge].max() <= MAX_DIFFERENCE[quality], device.name
+            assert difference[edge].max() <= MAX_EDGE_DIFFERENCE, device.name
+            assert (
+                numpy.percentile(difference[edge], 95) <= P95_EDGE_DIFFERENCE
+            ), device.name
+            assert (difference > 2).mean() <= MAX_DIFFERING, device.name
+    finally:
+        framing.console.quiet = False
@@ -0,0 +1,31 @@
+import pytest
+from PIL import Image
+
+from swpngx import frame as framing
+
+
+@pytest.mark.parametrize("mode", ["1", "L", "P", "RGB", "RGBA", "I;16"])
+@pytest.mark.parametrize("quality", list(framing.Quality))
+def test_read_screenshot_modes(devices, screen_style, tmp_path, mode, quality):
+    device = devices[0]
+    screen, style = screen_style(device)
+    file = tmp_path / "de-DE" / f"{device.name}-01_documents.png"
+    file.parent.mkdir()
+    Image.new(mode, tuple(device.target_size)).save(file)
+    job = framing.FrameJob(
+        file=file,
+        device=device,
+        screen=screen,
+        style=style,
+        title=None,
+        locale="de-DE",
+        output_file=tmp_path / "framed.png",
+    )
+
+    screenshot = framing.read_screenshot(job, framing.FrameOptions(quality=quality))
+
+    assert screenshot.mode == "RGBA"
+    if quality is framing.Quality.draft:
+        assert screenshot.size == framing.draft_size(device.target_size)
+    else:
+        assert screenshot.size == tuple(device.target_size)
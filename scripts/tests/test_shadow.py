@@ -0,0 +1,39 @@
+import numpy
+from PIL import Image
+
+from swpngx import frame as framing
+
+# Largest difference, in 8-bit levels, of the downscaled shadow on the
+# background, and the 99.9th percentile
+MAX_DIFFERENCE = 6
+P999_DIFFERENCE = 2
+
+
+def shadow_on_background(
+    template: framing.FrameTemplate,
+    device: framing.DeviceConfig,
+    style: framing.ScreenStyle,
+    downscale: int,
+) -> numpy.ndarray:
+    shadow = framing.make_shadow(
+        template.silhouette,
+        device.shadow_blur,
+        style.shadow_color,
+        passes=2,
+        downscale=downscale,
+    )
+    image = Image.new("RGBA", shadow.size, style.background_color)
+    image.alpha_composite(shadow)
+    return numpy.asarray(image, dtype=numpy.int16)
+
+
+def test_downscaled_shadow_matches_full_resolution(devices, screen_style):
+    for device in devices:
+        _, style = screen_style(device)
+        template = framing.frame_template(device, style)
+        full = shadow_on_background(template, device, style, 1)
+        reduced = shadow_on_background(template, device, style, framing.DRAFT_SCALE)
+
+        difference = numpy.abs(full - reduced).max(axis=2)
+        assert difference.max() <= MAX_DIFFERENCE, device.name
+        assert numpy.percentile(difference, 99.9) <= P999_DIFFERENCE, device.name
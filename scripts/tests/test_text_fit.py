@@ -0,0 +1,76 @@
+import pytest
+from PIL import Image
+
+from swpngx import frame as framing
+from swpngx.bench import synthetic_bezel
+from swpngx.frame_manifest import FrameManifest
+from swpngx.text_wrap import TextWrapConfig, fit_text_size
+
+FRAMES_TOML = """\
+input_folder = "screenshots"
+output_folder = "framed"
+string_catalog = "{repo}/fastlane/screenshots/Screenshots.xcstrings"
+font_file = "{font}"
+devices = "{repo}/screenshot_devices.toml"
+
+[[screens]]
+device_pattern = ".*"
+screen_pattern = ".*"
+title_key = "documentView"
+
+[screens.style]
+background_color = "#f0f0f0"
+shadow_color = "#888888"
+text_color = "#17541F"
+text_offset = [60, 60]
+text_size = 100
+font_spacing = 10
+text_fit = {{ max_lines = 2, min_size = {min_size} }}
+"""
+
+
+def test_fit_text_size_stays_below_max_size(font_file):
+    # Too long for two lines at any of these sizes
+    size = fit_text_size(
+        "Alle Dokumente immer und überall im Blick",
+        font_file,
+        TextWrapConfig(max_width=400),
+        max_lines=2,
+        min_size=120,
+        max_size=100,
+        variation="Bold",
+    )
+
+    assert size <= 100
+
+
+@pytest.mark.parametrize("min_size", [60, 120])
+def test_plan_checks_min_size_against_text_size(
+    tmp_path, frames_config, font_file, config, min_size
+):
+    config_file = tmp_path / "frames.toml"
+    config_file.write_text(
+        FRAMES_TOML.format(repo=frames_config.parent, font=font_file, min_size=min_size)
+    )
+    for device in config.devices:
+        bezel = tmp_path / device.frame_path
+        bezel.parent.mkdir(parents=True, exist_ok=True)
+        synthetic_bezel(device).save(bezel)
+    device = config.devices[0]
+    screenshot = tmp_path / "screenshots" / "de-DE" / f"{device.name}-01_documents.png"
+    screenshot.parent.mkdir(parents=True)
+    Image.new("RGB", tuple(device.target_size)).save(screenshot)
+    inputs = framing.load_frame_inputs(config_file)
+
+    def plan():
+        return framing.plan_frames(
+            inputs, [screenshot], FrameManifest(), {}, framing.FrameOptions()
+        )
+
+    if min_size <= 100:
+        planned, _ = plan()
+        assert list(planned) == [screenshot]
+    else:
+        with pytest.raises(framing.FramePlanError) as error:
+            plan()
+        assert "min_size 120 is above text_size 100" in str(error.value)
@@ -0,0 +1,25 @@
+import pytest
+
+from swpngx.text_wrap import TextWrapConfig, WrapStrategy, load_font, wrap_text_pixel
+
+MIXED_TITLE = "Hello 世界你好世界你好世界你好世界你好 world"
+
+
+@pytest.mark.parametrize("strategy", list(WrapStrategy))
+@pytest.mark.parametrize("max_width", [50, 300, 1000])
+def test_wrapped_lines_join_back_to_the_title(font_file, strategy, max_width):
+    # At 50 px not even a single character fits, so words are forced apart
+    config = TextWrapConfig(max_width=max_width, strategy=strategy)
+    lines = wrap_text_pixel(
+        MIXED_TITLE, load_font(font_file, 100, "Bold"), config, locale="zh-Hans"
+    )
+
+    text = "".join(
+        (
+            line.text.removesuffix(config.hyphen_char)
+            if line.ends_with_hyphen
+            else line.text
+        )
+        for line in lines
+    )
+    assert text.replace(" ", "") == MIXED_TITLE.replace(" ", "")